@@ -1,8 +1,142 @@
 """Active Time Ranges starter file."""
+import bisect
+import operator
+import random
+import time
+from itertools import accumulate
+
 
 class ActiveTimeRanges:
-    def __init__(self, intervals: list[list[int]]):
-        self.intervals, self.total_active_time = self.merge_and_measure(intervals)
+    def __init__(self, intervals: list[list[int]] | None = None, load: int = 32):
+        merged, self.total_active_time = self.merge_and_measure(intervals or [])
+        self.load = load
+        # merged, disjoint, sorted intervals, cut into blocks of at most 2 * load; an add only
+        # shifts one block instead of every later interval
+        self.block_starts = [[start for start, _ in merged[i:i + load]] for i in range(0, len(merged), load)]
+        self.block_ends = [[end for _, end in merged[i:i + load]] for i in range(0, len(merged), load)]
+        self.cum = [None] * len(self.block_starts)
+        for b in range(len(self.block_starts)):
+            self._refresh(b)
+        self._reindex()
+
+    @property
+    def intervals(self) -> tuple[list[int], ...]:
+        return tuple([start, end] for starts, ends in zip(self.block_starts, self.block_ends)
+                     for start, end in zip(starts, ends))
+
+    def _refresh(self, b: int) -> None:
+        # cum[b][i] = total length of the first i intervals of block b
+        self.cum[b] = list(accumulate(map(operator.sub, self.block_ends[b], self.block_starts[b]), initial=0))
+
+    def _reindex(self) -> None:
+        """Rebuild the block bounds and the Fenwick tree after blocks are split or dropped."""
+        self.firsts = [starts[0] for starts in self.block_starts]
+        self.lasts = [ends[-1] for ends in self.block_ends]
+        # Fenwick tree over block lengths: prefix sums and point updates in O(log blocks)
+        n = len(self.cum)
+        self.tree = [0] + [cum[-1] for cum in self.cum]
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                self.tree[j] += self.tree[i]
+
+    def _tree_add(self, b: int, delta: int) -> None:
+        i = b + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def _blocks_before(self, b: int) -> int:
+        total, i = 0, b
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def _update_block(self, b: int) -> None:
+        old = self.cum[b][-1]
+        self._refresh(b)
+        self.firsts[b], self.lasts[b] = self.block_starts[b][0], self.block_ends[b][-1]
+        self._tree_add(b, self.cum[b][-1] - old)
+
+    def add(self, start: int, end: int) -> None:
+        if not self.block_starts:
+            self.total_active_time += end - start
+            self.block_starts, self.block_ends, self.cum = [[start]], [[end]], [[0, end - start]]
+            self._reindex()
+            return
+        # first stored interval with end >= start, and one past the last with start <= end:
+        # everything in between overlaps or touches [start, end]
+        bi = bisect.bisect_left(self.lasts, start)
+        if bi == len(self.lasts):
+            bi, i = bi - 1, len(self.block_starts[-1])
+        else:
+            i = bisect.bisect_left(self.block_ends[bi], start)
+        bj = bisect.bisect_right(self.firsts, end) - 1
+        j = bisect.bisect_right(self.block_starts[bj], end) if bj >= 0 else 0
+        starts, ends = self.block_starts[bi], self.block_ends[bi]
+        structural = False
+        if bj < bi or (bj == bi and j <= i):
+            self.total_active_time += end - start
+            starts.insert(i, start)
+            ends.insert(i, end)
+        elif bj == bi:
+            start, end = min(start, starts[i]), max(end, ends[j - 1])
+            self.total_active_time += end - start - (self.cum[bi][j] - self.cum[bi][i])
+            starts[i:j] = [start]
+            ends[i:j] = [end]
+        else:
+            # the merge spans blocks bi..bj: keep the head of bi, the tail of bj, drop the middle
+            last_starts, last_ends = self.block_starts[bj], self.block_ends[bj]
+            start, end = min(start, starts[i]), max(end, last_ends[j - 1])
+            removed = (self.cum[bi][-1] - self.cum[bi][i] + self.cum[bj][j]
+                       + self._blocks_before(bj) - self._blocks_before(bi + 1))
+            self.total_active_time += end - start - removed
+            starts[i:] = [start]
+            ends[i:] = [end]
+            del last_starts[:j], last_ends[:j]
+            drop_to = bj if last_starts else bj + 1
+            if drop_to > bi + 1:
+                del self.block_starts[bi + 1:drop_to], self.block_ends[bi + 1:drop_to], self.cum[bi + 1:drop_to]
+                if last_starts:
+                    self._refresh(bi + 1)
+                structural = True
+            else:
+                self._update_block(bi + 1)
+        if len(starts) > 2 * self.load:
+            self.block_starts.insert(bi + 1, starts[self.load:])
+            self.block_ends.insert(bi + 1, ends[self.load:])
+            self.cum.insert(bi + 1, None)
+            del starts[self.load:], ends[self.load:]
+            self._refresh(bi + 1)
+            structural = True
+        if structural:
+            self._refresh(bi)
+            self._reindex()
+        else:
+            self._update_block(bi)
+
+    def is_active(self, t: int) -> bool:
+        """Intervals are half-open: [start, end)."""
+        b = bisect.bisect_right(self.firsts, t) - 1
+        if b < 0:
+            return False
+        i = bisect.bisect_right(self.block_starts[b], t) - 1
+        return t < self.block_ends[b][i]
+
+    def _active_before(self, t: int) -> int:
+        b = bisect.bisect_right(self.firsts, t) - 1
+        if b < 0:
+            return 0
+        starts, ends = self.block_starts[b], self.block_ends[b]
+        i = bisect.bisect_right(starts, t) - 1
+        return self._blocks_before(b) + self.cum[b][i] + min(t, ends[i]) - starts[i]
+
+    def active_between(self, a: int, b: int) -> int:
+        """Active time inside [a, b)."""
+        if b <= a:
+            return 0
+        return self._active_before(b) - self._active_before(a)
 
     def merge_and_measure(self, intervals: list[list[int]]) -> tuple[list[list[int]], int]:
         intervals = sorted(intervals, key=lambda x: x[0])
@@ -18,8 +152,9 @@ class ActiveTimeRanges:
             elif end != new_intervals[-1][1] and start != new_intervals[-1][0]:
                 counter=counter+(new_intervals[-1][1]-new_intervals[-1][0])
                 new_intervals.append([start, end])
+        if not new_intervals:
+            return tuple(), 0
         counter=counter+(new_intervals[-1][1]-new_intervals[-1][0])
-        print(new_intervals, counter)
         return tuple(new_intervals), counter 
 
 if __name__ == "__main__":
@@ -29,3 +164,55 @@ if __name__ == "__main__":
     print( atr.intervals == tuple([[1, 5]]) and atr.total_active_time ==  4)
     atr = ActiveTimeRanges([[7, 9], [1, 2], [2, 4], [10, 12]])
     print( atr.intervals == tuple([[1, 4], [7, 9], [10, 12]]) and atr.total_active_time ==  7)
+
+    # online adds keep the same merged view and running total
+    atr = ActiveTimeRanges()
+    for start, end in [[7, 9], [1, 2], [2, 4], [10, 12]]:
+        atr.add(start, end)
+    print( atr.intervals == tuple([[1, 4], [7, 9], [10, 12]]) and atr.total_active_time ==  7)
+    atr.add(3, 10)      # bridges everything
+    print( atr.intervals == tuple([[1, 12]]) and atr.total_active_time ==  11)
+    print( atr.is_active(1) and atr.is_active(11) and not atr.is_active(12) and not atr.is_active(0))
+
+    atr = ActiveTimeRanges([[1, 3], [5, 8], [10, 20]])
+    print( atr.active_between(0, 100) == 15 and atr.active_between(2, 6) == 2 and atr.active_between(6, 15) == 7)
+
+    # randomized check against a brute-force timeline; small blocks exercise splits and
+    # merges that span and drop whole blocks
+    rng = random.Random(0)
+    ok = True
+    for load in (2, 32):
+        atr = ActiveTimeRanges(load=load)
+        timeline = [False] * 1_000
+        for step in range(1_500):
+            start = rng.randrange(990)
+            end = start + (rng.randrange(1, 10) if step % 50 else rng.randrange(1, 200))
+            end = min(end, 1_000)
+            atr.add(start, end)
+            for t in range(start, end):
+                timeline[t] = True
+            a, b = sorted((rng.randrange(1_000), rng.randrange(1_000)))
+            ok &= atr.total_active_time == sum(timeline)
+            ok &= atr.active_between(a, b) == sum(timeline[a:b])
+            ok &= atr.is_active(a) == timeline[a]
+        ok &= atr.intervals == ActiveTimeRanges(list(atr.intervals)).intervals
+    print(ok)
+
+    # adds and queries interleaved: per-operation cost should stay flat as the set grows
+    print()
+    for n in (50_000, 500_000):
+        intervals = []
+        for _ in range(n):
+            s0 = rng.randrange(10**10)
+            intervals.append([s0, s0 + rng.randrange(1, 1_000)])
+        atr = ActiveTimeRanges(intervals)
+        ops = 100_000
+        start = time.perf_counter()
+        for _ in range(ops):
+            s0 = rng.randrange(10**10)
+            atr.add(s0, s0 + rng.randrange(1, 1_000))
+            a = rng.randrange(10**10)
+            atr.is_active(a)
+            atr.active_between(a, a + 10**7)
+        op_us = (time.perf_counter() - start) / ops * 1e6
+        print(f"{n:>9,} intervals: {op_us:.2f} us per add + is_active + active_between")
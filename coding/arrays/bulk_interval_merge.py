@@ -0,0 +1,120 @@
+"""Bulk interval merge with NumPy, plus a bounded-memory streaming variant."""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from active_time_ranges import ActiveTimeRanges
+
+
+def merge_intervals(starts, ends) -> tuple[np.ndarray, np.ndarray, int]:
+    """Merge overlapping/touching intervals; returns (merged_starts, merged_ends, total_active_time)."""
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    if starts.size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, 0
+    order = np.argsort(starts, kind="stable")
+    return _merge_sorted(starts[order], ends[order])
+
+
+def _merge_sorted(starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray, int]:
+    # running max of the ends: everything up to i is covered until reach[i]
+    reach = np.maximum.accumulate(ends)
+    # a new merged interval begins wherever a start lies past everything before it
+    # (equal means touching, which merges)
+    boundary = np.empty(starts.size, dtype=bool)
+    boundary[0] = True
+    np.greater(starts[1:], reach[:-1], out=boundary[1:])
+    first = np.flatnonzero(boundary)
+    last = np.append(first[1:] - 1, starts.size - 1)
+    merged_starts, merged_ends = starts[first], reach[last]
+    return merged_starts, merged_ends, int((merged_ends - merged_starts).sum())
+
+
+def read_chunks(path: str, chunk_rows: int = 1_000_000):
+    """Yield (starts, ends) chunks from a binary file of int64 (start, end) pairs."""
+    if os.path.getsize(path) == 0:
+        return   # np.memmap cannot map an empty file
+    pairs = np.memmap(path, dtype=np.int64, mode="r").reshape(-1, 2)
+    for offset in range(0, len(pairs), chunk_rows):
+        chunk = np.array(pairs[offset:offset + chunk_rows])   # copy only this chunk into memory
+        yield chunk[:, 0], chunk[:, 1]
+
+
+def stream_merge(chunks):
+    """Merge chunks of intervals already sorted by start across the whole stream.
+
+    Yields (merged_starts, merged_ends) per chunk. Only the last merged interval of a chunk is
+    held back, because the next chunk may still extend it, so memory is bounded by one chunk.
+    """
+    carry_start = carry_end = None
+    for starts, ends in chunks:
+        if starts.size == 0:
+            continue
+        if carry_start is not None:
+            starts = np.concatenate(([carry_start], starts))
+            ends = np.concatenate(([carry_end], ends))
+        merged_starts, merged_ends, _ = _merge_sorted(starts, ends)
+        carry_start, carry_end = merged_starts[-1], merged_ends[-1]
+        if merged_starts.size > 1:
+            yield merged_starts[:-1], merged_ends[:-1]
+    if carry_start is not None:
+        yield np.array([carry_start]), np.array([carry_end])
+
+
+def stream_total_active_time(path: str, chunk_rows: int = 1_000_000) -> int:
+    return sum(int((e - s).sum()) for s, e in stream_merge(read_chunks(path, chunk_rows)))
+
+
+if __name__ == "__main__":
+    for intervals, merged, total in [
+        ([[1, 3], [2, 6], [8, 10], [15, 18]], [[1, 6], [8, 10], [15, 18]], 10),
+        ([[1, 4], [4, 5]], [[1, 5]], 4),
+        ([[7, 9], [1, 2], [2, 4], [10, 12]], [[1, 4], [7, 9], [10, 12]], 7),
+        ([[1, 10], [2, 3], [4, 5], [11, 12]], [[1, 10], [11, 12]], 10),
+    ]:
+        starts, ends, active = merge_intervals(*zip(*intervals))
+        print(np.column_stack([starts, ends]).tolist() == merged and active == total)
+
+    # matches the Python implementation on random data
+    rng = np.random.default_rng(0)
+    n = 2_000_000
+    starts = rng.integers(0, 10**9, n)
+    ends = starts + rng.integers(1, 2_000, n)
+    as_lists = np.column_stack([starts, ends]).tolist()
+    py_start = time.perf_counter()
+    expected, expected_total = ActiveTimeRanges().merge_and_measure(as_lists)
+    py_s = time.perf_counter() - py_start
+    np_start = time.perf_counter()
+    merged_starts, merged_ends, total = merge_intervals(starts, ends)
+    np_s = time.perf_counter() - np_start
+    print(total == expected_total and np.column_stack([merged_starts, merged_ends]).tolist() == list(expected))
+
+    # streaming from disk in small chunks gives the same answer
+    order = np.argsort(starts, kind="stable")
+    sorted_starts, sorted_ends = starts[order], ends[order]
+    presorted_start = time.perf_counter()
+    _merge_sorted(sorted_starts, sorted_ends)
+    presorted_s = time.perf_counter() - presorted_start
+    fd, path = tempfile.mkstemp(suffix=".bin")
+    os.close(fd)
+    try:
+        np.column_stack([sorted_starts, sorted_ends]).astype(np.int64).tofile(path)
+        chunks = list(stream_merge(read_chunks(path, chunk_rows=100_000)))
+        print(np.array_equal(np.concatenate([s for s, _ in chunks]), merged_starts) and
+              np.array_equal(np.concatenate([e for _, e in chunks]), merged_ends))
+        stream_start = time.perf_counter()
+        streamed_total = stream_total_active_time(path)
+        stream_s = time.perf_counter() - stream_start
+        print(streamed_total == total)
+        open(path, "wb").close()
+        print(stream_total_active_time(path) == 0)   # an empty file has no chunks
+    finally:
+        os.remove(path)
+
+    # the streaming path takes input already sorted by start, so compare it to numpy on the same
+    print(f"\n{n:,} unsorted intervals: python loop {py_s:.2f}s, numpy (argsort + merge) {np_s:.3f}s")
+    print(f"{n:,} pre-sorted intervals: numpy in memory {presorted_s:.3f}s, "
+          f"streaming from disk {stream_s:.3f}s")
@@ -0,0 +1,303 @@
+# Scan-Resistant Cache Policies (ARC and W-TinyLFU)
+
+# Problem Statement:
+# Plain LRU admits every key, so one sequential batch scan through `LRUCache` flushes the hot
+# working set. Provide pluggable policies behind the same `get`/`put` API:
+#   - "lru":       the existing LRUCache (baseline)
+#   - "arc":       Adaptive Replacement Cache; balances recency (T1) and frequency (T2) using
+#                  ghost lists (B1/B2) of recently evicted keys
+#   - "w-tinylfu": a small LRU admission window in front of a segmented LRU main area; a window
+#                  victim only enters the main area if a count-min sketch says it is more
+#                  frequent than the main area's victim
+# A trace-replay harness reports hit ratio and ops/sec per policy on Zipf and scan-heavy traces.
+
+# Examples:
+# 1. `cache = make_cache("arc", 100); cache.put(1, 1); cache.get(1)` → `1`
+# 2. replaying a Zipf trace with a one-off scan keeps the hot keys under "w-tinylfu" and "arc"
+
+from collections import OrderedDict
+import bisect
+import random
+import time
+
+from lru_cache import LRUCache
+
+
+class _FrequencySketch:
+    """Frequency sketch with small saturating counters that halve periodically (aging).
+
+    Not `heavy_hitters.CountMinSketch`: that one is sized from (epsilon, delta), takes weighted
+    adds and merges across processes; this one only needs cheap relative frequencies.
+    """
+
+    # One 256-bit odd multiplier; each 64-bit lane of `hash * MIX` is an independent
+    # multiply-shift hash, so a single big-int multiply yields all four row indexes.
+    MIX = 0xD6E8FEB86659FD93_165667B19E3779F9_C2B2AE3D27D4EB4F_9E3779B97F4A7C15
+    MAX_COUNT = 15  # 4-bit counters, stored one per byte for simplicity
+    HALVE = bytes(c >> 1 for c in range(256))
+
+    def __init__(self, width: int, sample_factor: int = 10):
+        size = 1
+        while size < max(width, 16):
+            size <<= 1
+        self.width = size
+        self.mask = size - 1
+        self.depth = 4
+        self.table = bytearray(self.width * self.depth)
+        self.sample_size = sample_factor * self.width
+        self.additions = 0
+
+    def _indexes(self, key) -> tuple[int, int, int, int]:
+        m = (hash(key) & 0xFFFFFFFFFFFFFFFF) * self.MIX
+        width, mask = self.width, self.mask
+        return ((m >> 40) & mask, width + ((m >> 104) & mask),
+                2 * width + ((m >> 168) & mask), 3 * width + ((m >> 232) & mask))
+
+    def increment(self, key) -> None:
+        table = self.table
+        for i in self._indexes(key):
+            if table[i] < self.MAX_COUNT:
+                table[i] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._reset()
+
+    def estimate(self, key) -> int:
+        table = self.table
+        a, b, c, d = self._indexes(key)
+        return min(table[a], table[b], table[c], table[d])
+
+    def _reset(self) -> None:
+        # Halve every counter so old popularity decays; amortized over `sample_size` increments.
+        self.table = bytearray(self.table.translate(self.HALVE))
+        self.additions //= 2
+
+
+class ARCCache:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.p = 0                # target size of T1
+        self.t1 = OrderedDict()   # seen once recently: key -> value
+        self.t2 = OrderedDict()   # seen at least twice recently: key -> value
+        self.b1 = OrderedDict()   # ghosts evicted from T1: key -> None
+        self.b2 = OrderedDict()   # ghosts evicted from T2: key -> None
+
+    def get(self, key: int) -> int:
+        if key in self.t1:
+            value = self.t1.pop(key)
+            self.t2[key] = value
+            return value
+        if key in self.t2:
+            self.t2.move_to_end(key)
+            return self.t2[key]
+        return -1
+
+    def put(self, key: int, value: int) -> None:
+        c = self.capacity
+        if key in self.t1:
+            del self.t1[key]
+            self.t2[key] = value
+            return
+        if key in self.t2:
+            self.t2[key] = value
+            self.t2.move_to_end(key)
+            return
+        if key in self.b1:
+            # recency was evicted too early: grow T1's target
+            self.p = min(c, self.p + max(len(self.b2) // max(len(self.b1), 1), 1))
+            self._replace(key)
+            del self.b1[key]
+            self.t2[key] = value
+            return
+        if key in self.b2:
+            # frequency was evicted too early: shrink T1's target
+            self.p = max(0, self.p - max(len(self.b1) // max(len(self.b2), 1), 1))
+            self._replace(key)
+            del self.b2[key]
+            self.t2[key] = value
+            return
+
+        l1 = len(self.t1) + len(self.b1)
+        total = l1 + len(self.t2) + len(self.b2)
+        if l1 == c:
+            if len(self.t1) < c:
+                self.b1.popitem(last=False)
+                self._replace(key)
+            else:
+                self.t1.popitem(last=False)
+        elif l1 < c and total >= c:
+            if total >= 2 * c:
+                self.b2.popitem(last=False)
+            self._replace(key)
+        self.t1[key] = value
+
+    def _replace(self, key) -> None:
+        if self.t1 and (len(self.t1) > self.p or (key in self.b2 and len(self.t1) == self.p)):
+            old_key, _ = self.t1.popitem(last=False)
+            self.b1[old_key] = None
+        elif self.t2:
+            old_key, _ = self.t2.popitem(last=False)
+            self.b2[old_key] = None
+        elif self.t1:
+            old_key, _ = self.t1.popitem(last=False)
+            self.b1[old_key] = None
+
+    def __len__(self) -> int:
+        return len(self.t1) + len(self.t2)
+
+
+class WTinyLFUCache:
+    def __init__(self, capacity: int, window_ratio: float = 0.01, protected_ratio: float = 0.8):
+        self.capacity = capacity
+        self.window_capacity = max(1, int(capacity * window_ratio))
+        self.main_capacity = max(1, capacity - self.window_capacity)
+        self.protected_capacity = max(1, int(self.main_capacity * protected_ratio))
+        self.window = OrderedDict()     # admission window, plain LRU
+        self.probation = OrderedDict()  # main area, seen once since admission
+        self.protected = OrderedDict()  # main area, hit again while in probation
+        self.sketch = _FrequencySketch(capacity)
+
+    def get(self, key: int) -> int:
+        self.sketch.increment(key)
+        if key in self.window:
+            self.window.move_to_end(key)
+            return self.window[key]
+        if key in self.protected:
+            self.protected.move_to_end(key)
+            return self.protected[key]
+        if key in self.probation:
+            value = self.probation.pop(key)
+            self._promote(key, value)
+            return value
+        return -1
+
+    def put(self, key: int, value: int) -> None:
+        for segment in (self.window, self.protected, self.probation):
+            if key in segment:
+                segment[key] = value
+                segment.move_to_end(key)   # a fresh write is as recent as a hit
+                return
+        # the miss that led to this put was already counted by get()
+        self.window[key] = value
+        if len(self.window) > self.window_capacity:
+            candidate, candidate_value = self.window.popitem(last=False)
+            self._admit(candidate, candidate_value)
+
+    def _promote(self, key, value) -> None:
+        self.protected[key] = value
+        if len(self.protected) > self.protected_capacity:
+            demoted, demoted_value = self.protected.popitem(last=False)
+            self.probation[demoted] = demoted_value
+
+    def _admit(self, candidate, value) -> None:
+        if len(self.probation) + len(self.protected) < self.main_capacity:
+            self.probation[candidate] = value
+            return
+        victims = self.probation if self.probation else self.protected
+        victim = next(iter(victims))
+        if self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            del victims[victim]
+            self.probation[candidate] = value
+        # otherwise the candidate is dropped and the main area is left untouched
+
+    def __len__(self) -> int:
+        return len(self.window) + len(self.probation) + len(self.protected)
+
+
+POLICIES = {
+    "lru": LRUCache,
+    "arc": ARCCache,
+    "w-tinylfu": WTinyLFUCache,
+}
+
+
+def make_cache(policy: str, capacity: int):
+    if policy not in POLICIES:
+        raise ValueError(f"unknown policy {policy!r}, expected one of {sorted(POLICIES)}")
+    return POLICIES[policy](capacity)
+
+
+def zipf_trace(num_keys: int, length: int, s: float = 0.99, seed: int = 0) -> list[int]:
+    rng = random.Random(seed)
+    cdf = []
+    total = 0.0
+    for rank in range(1, num_keys + 1):
+        total += 1.0 / rank ** s
+        cdf.append(total)
+    return [bisect.bisect_left(cdf, rng.random() * total) for _ in range(length)]
+
+
+def scan_trace(num_keys: int, length: int, scan_length: int, scan_every: int, seed: int = 0) -> list[int]:
+    """Zipf traffic interrupted by sequential scans over keys that are never seen again."""
+    hot = zipf_trace(num_keys, length, seed=seed)
+    trace = []
+    next_scan_key = num_keys
+    for i, key in enumerate(hot):
+        if i and i % scan_every == 0:
+            trace.extend(range(next_scan_key, next_scan_key + scan_length))
+            next_scan_key += scan_length
+        trace.append(key)
+    return trace
+
+
+def replay(cache, trace: list[int]) -> tuple[float, float]:
+    """Read-through replay: get, and put on a miss. Returns (hit_ratio, ops_per_sec)."""
+    hits = 0
+    start = time.perf_counter()
+    for key in trace:
+        if cache.get(key) != -1:
+            hits += 1
+        else:
+            cache.put(key, key)
+    elapsed = time.perf_counter() - start
+    return hits / len(trace), len(trace) / elapsed
+
+
+if __name__ == "__main__":
+    for policy in POLICIES:
+        cache = make_cache(policy, 2)
+        cache.put(1, 1)
+        cache.put(2, 2)
+        print(policy, cache.get(1) == 1, cache.get(99) == -1)
+
+    # ARC: a key hit twice lives in T2 and survives a stream of one-off keys
+    arc = ARCCache(4)
+    arc.put(1, 1)
+    arc.get(1)
+    for k in range(100, 110):
+        arc.put(k, k)
+    print(arc.get(1) == 1, len(arc) <= 4)
+
+    # W-TinyLFU: a frequent key is not displaced by a burst of one-off keys
+    lfu = WTinyLFUCache(100)
+    for _ in range(10):
+        lfu.put(7, 7)
+        lfu.get(7)
+    for k in range(1000, 1500):
+        lfu.get(k)
+        lfu.put(k, k)
+    print(lfu.get(7) == 7, len(lfu) <= 100)
+
+    # W-TinyLFU: overwriting a key refreshes its recency, so it is not the next window victim
+    lfu = WTinyLFUCache(100, window_ratio=0.05)
+    for k in range(1, 6):
+        lfu.put(k, k)
+    lfu.put(1, "new")
+    lfu.put(6, 6)
+    print(lfu.window.get(1) == "new" and 2 not in lfu.window)
+
+    # sketch: estimates never undercount (before aging) and saturate at MAX_COUNT
+    sketch = _FrequencySketch(64)
+    for _ in range(5):
+        sketch.increment("a")
+    print(sketch.estimate("a") >= 5, sketch.estimate("never-seen") <= 5)
+
+    traces = {
+        "zipf": zipf_trace(10_000, 200_000),
+        "zipf+scan": scan_trace(10_000, 200_000, scan_length=2_000, scan_every=10_000),
+    }
+    print("\n=== Trace replay, capacity=500 ===")
+    for name, trace in traces.items():
+        for policy in POLICIES:
+            hit_ratio, ops = replay(make_cache(policy, 500), trace)
+            print(f"{name:10s} {policy:10s} hit_ratio={hit_ratio:.3f} ops/sec={ops:,.0f}")
@@ -0,0 +1,243 @@
+# Bounded TTL Cache (TTL + LRU eviction, background reaper)
+
+# Problem Statement:
+# `TTLCache` has no size limit. Add a `max_entries` / `max_bytes` bound:
+#   - when a `set` goes over the bound, expired entries are evicted first (earliest deadline
+#     first), then least recently used entries
+#   - an optional background reaper samples keys and deletes the expired ones, like Redis'
+#     probabilistic expiry loop: sample 20 keys, delete the expired ones, and repeat while more
+#     than 25% of the sample was expired and the cycle's CPU budget is not used up
+#   - `get`/`set` are thread-safe; `get` takes no lock on a hit. Recency is a timestamp written
+#     on read and LRU is approximated by sampling, as Redis does, so reads never reorder a shared list.
+
+# Examples:
+# 1. `cache = BoundedTTLCache(ttl_ms=1000, max_entries=2)`
+# 2. `set("a", 1, now_ms=0); set("b", 2, now_ms=0); get("a", now_ms=10); set("c", 3, now_ms=20)` → evicts "b"
+# 3. `set("x", 1, now_ms=0, ttl_ms=5); set("y", 2, now_ms=10); set("z", 3, now_ms=10)` → evicts expired "x" first
+
+import heapq
+import random
+import sys
+import threading
+import time
+
+
+class Entry:
+    __slots__ = ("value", "expires_at", "nbytes", "last_access", "pos")
+
+    def __init__(self, value, expires_at, nbytes, last_access, pos):
+        self.value = value
+        self.expires_at = expires_at
+        self.nbytes = nbytes
+        self.last_access = last_access
+        self.pos = pos          # index in BoundedTTLCache.keys, for O(1) random sampling
+
+
+def default_sizeof(key, value) -> int:
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class BoundedTTLCache:
+    def __init__(self, ttl_ms: int = 1000, max_entries: int | None = None, max_bytes: int | None = None,
+                 sizeof=default_sizeof, lru_samples: int = 5):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.ttl = ttl_ms
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.lru_samples = lru_samples
+        self.cache = {}         # key -> Entry
+        self.keys = []          # dense key list for sampling
+        self.deadlines = []     # lazy (expires_at, key) min-heap
+        self.total_bytes = 0
+        self.lock = threading.Lock()   # writers only
+        self.evictions = {"expired": 0, "lru": 0, "reaper": 0}
+        self.reaper = None
+        self.reaper_stop = threading.Event()
+
+    def _now(self, now_ms):
+        return time.time() * 1000 if now_ms is None else now_ms
+
+    def get(self, key: str, now_ms: int | None = None) -> object | None:
+        now_ms = self._now(now_ms)
+        entry = self.cache.get(key)   # lock-free: a single dict lookup is atomic
+        if entry is None:
+            return None
+        if now_ms > entry.expires_at:
+            with self.lock:
+                if self.cache.get(key) is entry:
+                    self._remove(key)
+            return None
+        entry.last_access = now_ms
+        return entry.value
+
+    def set(self, key: str, value, now_ms: int | None = None, ttl_ms: int | None = None) -> bool:
+        now_ms = self._now(now_ms)
+        expires_at = now_ms + (self.ttl if ttl_ms is None else ttl_ms)
+        nbytes = self.sizeof(key, value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return False
+        with self.lock:
+            if key in self.cache:
+                self._remove(key)
+            self.cache[key] = Entry(value, expires_at, nbytes, now_ms, len(self.keys))
+            self.keys.append(key)
+            self.total_bytes += nbytes
+            heapq.heappush(self.deadlines, (expires_at, key))
+            self._enforce_bounds(now_ms, protect=key)
+        return True
+
+    def _over_bounds(self) -> bool:
+        return ((self.max_entries is not None and len(self.cache) > self.max_entries) or
+                (self.max_bytes is not None and self.total_bytes > self.max_bytes))
+
+    def _remove(self, key) -> None:
+        # caller holds self.lock; swap-remove keeps self.keys dense
+        entry = self.cache.pop(key)
+        last = self.keys.pop()
+        if last != key:
+            self.keys[entry.pos] = last
+            self.cache[last].pos = entry.pos
+        self.total_bytes -= entry.nbytes
+
+    def _enforce_bounds(self, now_ms, protect) -> None:
+        # 1) expired entries, earliest deadline first
+        while self._over_bounds() and self.deadlines and self.deadlines[0][0] < now_ms:
+            expires_at, key = heapq.heappop(self.deadlines)
+            entry = self.cache.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.evictions["expired"] += 1
+        # 2) approximate LRU: evict the least recently used of a few random keys
+        while self._over_bounds() and len(self.cache) > 1:
+            sample = [self.keys[random.randrange(len(self.keys))] for _ in range(self.lru_samples)]
+            victim = min((k for k in sample if k != protect),
+                         key=lambda k: self.cache[k].last_access, default=None)
+            if victim is not None:
+                self._remove(victim)
+                self.evictions["lru"] += 1
+        if len(self.deadlines) > 2 * len(self.cache) + 64:
+            # drop heap entries left behind by overwrites and evictions
+            self.deadlines = [(e.expires_at, k) for k, e in self.cache.items()]
+            heapq.heapify(self.deadlines)
+
+    def reap(self, now_ms: int | None = None, budget_ms: float = 1.0, sample_size: int = 20) -> int:
+        """One Redis-style active expiry cycle; returns how many keys were deleted."""
+        deadline = time.perf_counter() + budget_ms / 1000
+        removed = 0
+        while True:
+            now = self._now(now_ms)
+            expired = 0
+            with self.lock:
+                if not self.keys:
+                    return removed
+                for _ in range(min(sample_size, len(self.keys))):
+                    key = self.keys[random.randrange(len(self.keys))]
+                    if now > self.cache[key].expires_at:
+                        self._remove(key)
+                        expired += 1
+                        if not self.keys:
+                            break
+            removed += expired
+            self.evictions["reaper"] += expired
+            if expired * 4 <= sample_size or time.perf_counter() >= deadline:
+                return removed
+
+    def start_reaper(self, interval_s: float = 0.1, budget_ms: float = 1.0) -> None:
+        def loop():
+            while not self.reaper_stop.wait(interval_s):
+                self.reap(budget_ms=budget_ms)
+        self.reaper_stop.clear()
+        self.reaper = threading.Thread(target=loop, daemon=True)
+        self.reaper.start()
+
+    def stop_reaper(self) -> None:
+        if self.reaper is not None:
+            self.reaper_stop.set()
+            self.reaper.join()
+            self.reaper = None
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+
+if __name__ == "__main__":
+    # LRU once the entry bound is hit (one sample covers the whole cache here)
+    cache = BoundedTTLCache(ttl_ms=1000, max_entries=2, lru_samples=16)
+    cache.set("a", 1, now_ms=0)
+    cache.set("b", 2, now_ms=0)
+    cache.get("a", now_ms=10)
+    cache.set("c", 3, now_ms=20)
+    print(cache.get("b", now_ms=20) is None and cache.get("a", now_ms=20) == 1 and len(cache) == 2)
+
+    # expired entries go first, even if they were used more recently
+    cache = BoundedTTLCache(ttl_ms=1000, max_entries=2, lru_samples=16)
+    cache.set("x", 1, now_ms=0, ttl_ms=5)
+    cache.set("y", 2, now_ms=1)
+    cache.get("x", now_ms=4)
+    cache.set("z", 3, now_ms=10)
+    print(set(cache.cache) == {"y", "z"} and cache.evictions["expired"] == 1)
+
+    # byte budget; oversized values are refused
+    cache = BoundedTTLCache(ttl_ms=1000, max_bytes=1_000, sizeof=lambda k, v: len(v))
+    for i in range(10):
+        cache.set(f"k{i}", "x" * 300, now_ms=i)
+    print(cache.total_bytes <= 1_000 and len(cache) == 3)
+    print(cache.set("huge", "x" * 1_001, now_ms=20) is False)
+
+    # reaper deletes expired keys nobody reads
+    cache = BoundedTTLCache(ttl_ms=10)
+    for i in range(1_000):
+        cache.set(f"k{i}", i, now_ms=0)
+    for i in range(100):
+        cache.set(f"live{i}", i, now_ms=0, ttl_ms=10_000)
+    while cache.reap(now_ms=100, budget_ms=50):
+        pass
+    print(len(cache) < 200 and all(f"live{i}" in cache.cache for i in range(100)))
+
+    try:
+        BoundedTTLCache(max_entries=0)
+        print(False)
+    except ValueError:
+        print(True)
+
+    # the writer inserts far more distinct keys than fit, so both eviction paths run
+    max_entries = 1_000
+    print(f"\n=== 4 reader threads + 1 writer thread + reaper, max_entries={max_entries:,} ===")
+    cache = BoundedTTLCache(ttl_ms=200, max_entries=max_entries)
+    cache.start_reaper(interval_s=0.01, budget_ms=1.0)
+    stop = threading.Event()
+    reads = [0] * 4
+    peak = [0]
+
+    def reader(i):
+        rng = random.Random(i)
+        while not stop.is_set():
+            cache.get(f"k{rng.randrange(50_000)}")
+            reads[i] += 1
+
+    def writer():
+        rng = random.Random(99)
+        while not stop.is_set():
+            cache.set(f"k{rng.randrange(50_000)}", "v")
+
+    def monitor():
+        while not stop.is_set():
+            with cache.lock:   # a set is only over the bound inside its own critical section
+                peak[0] = max(peak[0], len(cache))
+            time.sleep(0.001)
+
+    threads = ([threading.Thread(target=reader, args=(i,)) for i in range(4)] +
+               [threading.Thread(target=writer), threading.Thread(target=monitor)])
+    for t in threads:
+        t.start()
+    time.sleep(1.0)
+    stop.set()
+    for t in threads:
+        t.join()
+    cache.stop_reaper()
+    print(peak[0] <= max_entries and len(cache) <= max_entries and cache.evictions["lru"] > 0)
+    print(f"reads/sec={sum(reads):,} peak entries={peak[0]:,} evictions={cache.evictions}")
@@ -0,0 +1,237 @@
+# Compact Array-Backed LRU Cache (int -> int)
+
+# Problem Statement:
+# `LRUCache` is typed int -> int but stores Python objects in an OrderedDict, which costs 100+
+# bytes per entry. For tens of millions of entries, keep the same `get`/`put` contract but store
+# everything in preallocated `array('q')` buffers:
+#   - keys / values / prev / next: one slot per entry, prev/next form the LRU doubly linked list
+#   - index: open-addressing hash table (linear probing) mapping key -> slot
+#   - free list: deleted slots are chained through `next` and recycled
+# Steady-state operations only rewrite array cells; no per-entry objects are created.
+
+# Examples:
+# 1. `lru = CompactLRUCache(2); put(1, 1); put(2, 2); get(1)` → `1`
+# 2. `put(3, 3)` → evicts key 2
+# 3. `get(2)` → `-1` (not found)
+
+from array import array
+import random
+import time
+import tracemalloc
+
+from lru_cache import LRUCache
+
+EMPTY = -1
+GOLDEN = 0x9E3779B97F4A7C15
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+class CompactLRUCache:
+    def __init__(self, capacity: int, load_factor: float = 0.5):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < load_factor < 1:
+            # linear probing needs at least one empty bucket to stop a lookup for a missing key
+            raise ValueError("load_factor must be in (0, 1)")
+        self.capacity = capacity
+        self.size = 0
+        self.keys = array("q", [0]) * capacity
+        self.values = array("q", [0]) * capacity
+        self.prev = array("q", [EMPTY]) * capacity
+        self.next = array("q", [EMPTY]) * capacity
+        self.head = EMPTY   # least recently used slot
+        self.tail = EMPTY   # most recently used slot
+        self.free_head = EMPTY
+        self.next_unused = 0  # slots >= next_unused have never been handed out
+
+        bits = 1
+        while (1 << bits) * load_factor < capacity:
+            bits += 1
+        self.shift = 64 - bits
+        self.mask = (1 << bits) - 1
+        self.index = array("q", [EMPTY]) * (1 << bits)
+
+    # --- hash index -----------------------------------------------------
+
+    def _home(self, key: int) -> int:
+        # Fibonacci hashing: spreads sequential ids across the table
+        return ((key * GOLDEN) & MASK64) >> self.shift
+
+    def _find(self, key: int) -> int:
+        """Return the bucket holding `key`, or the empty bucket where it would be inserted."""
+        index, keys, mask = self.index, self.keys, self.mask
+        i = self._home(key)
+        while True:
+            slot = index[i]
+            if slot == EMPTY or keys[slot] == key:
+                return i
+            i = (i + 1) & mask
+
+    def _unindex(self, i: int) -> None:
+        # Backward-shift deletion keeps linear probing correct without tombstones.
+        index, keys, mask = self.index, self.keys, self.mask
+        j = i
+        while True:
+            j = (j + 1) & mask
+            slot = index[j]
+            if slot == EMPTY:
+                break
+            home = self._home(keys[slot])
+            # leave the entry alone if its home lies cyclically in (i, j]
+            if (i < j and i < home <= j) or (i > j and (home > i or home <= j)):
+                continue
+            index[i] = slot
+            i = j
+        index[i] = EMPTY
+
+    # --- LRU list -------------------------------------------------------
+
+    def _unlink(self, slot: int) -> None:
+        p, n = self.prev[slot], self.next[slot]
+        if p == EMPTY:
+            self.head = n
+        else:
+            self.next[p] = n
+        if n == EMPTY:
+            self.tail = p
+        else:
+            self.prev[n] = p
+
+    def _append(self, slot: int) -> None:
+        self.prev[slot] = self.tail
+        self.next[slot] = EMPTY
+        if self.tail == EMPTY:
+            self.head = slot
+        else:
+            self.next[self.tail] = slot
+        self.tail = slot
+
+    def _allocate(self) -> int:
+        if self.free_head != EMPTY:
+            slot = self.free_head
+            self.free_head = self.next[slot]
+            return slot
+        slot = self.next_unused
+        self.next_unused += 1
+        return slot
+
+    # --- public API -----------------------------------------------------
+
+    def get(self, key: int) -> int:
+        slot = self.index[self._find(key)]
+        if slot == EMPTY:
+            return -1
+        if slot != self.tail:
+            self._unlink(slot)
+            self._append(slot)
+        return self.values[slot]
+
+    def put(self, key: int, value: int) -> None:
+        i = self._find(key)
+        slot = self.index[i]
+        if slot != EMPTY:
+            self.values[slot] = value
+            if slot != self.tail:
+                self._unlink(slot)
+                self._append(slot)
+            return
+
+        if self.size >= self.capacity:
+            # reuse the LRU slot in place
+            slot = self.head
+            self._unlink(slot)
+            self._unindex(self._find(self.keys[slot]))
+            i = self._find(key)  # backward shift may have moved the insertion point
+        else:
+            slot = self._allocate()
+            self.size += 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.index[i] = slot
+        self._append(slot)
+
+    def delete(self, key: int) -> bool:
+        i = self._find(key)
+        slot = self.index[i]
+        if slot == EMPTY:
+            return False
+        self._unindex(i)
+        self._unlink(slot)
+        self.next[slot] = self.free_head
+        self.free_head = slot
+        self.size -= 1
+        return True
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def bytes_per_entry(factory, n: int) -> float:
+    tracemalloc.start()
+    cache = factory(n)
+    for i in range(n):
+        cache.put(i, i)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # includes the boxed int keys/values the OrderedDict keeps alive; the arrays store raw int64
+    return current / n
+
+
+def latency_ns(cache, keys: list[int]) -> tuple[float, float]:
+    start = time.perf_counter()
+    for k in keys:
+        cache.put(k, k)
+    put_ns = (time.perf_counter() - start) / len(keys) * 1e9
+    start = time.perf_counter()
+    for k in keys:
+        cache.get(k)
+    get_ns = (time.perf_counter() - start) / len(keys) * 1e9
+    return get_ns, put_ns
+
+
+if __name__ == "__main__":
+    lru = CompactLRUCache(2)
+    lru.put(1, 1)
+    lru.put(2, 2)
+    print(lru.get(1) == 1)
+    lru.put(3, 3)    # evicts key 2
+    print(lru.get(2) == -1)
+    print(lru.get(3) == 3 and len(lru) == 2)
+    try:
+        CompactLRUCache(4, load_factor=1.0)
+        print(False)
+    except ValueError:
+        print(True)
+    tight = CompactLRUCache(4, load_factor=0.99)   # smallest table allowed still leaves an empty bucket
+    for k in range(10):
+        tight.put(k, k)
+    print(tight.get(100) == -1 and len(tight) == 4)
+
+    # delete recycles the slot through the free list
+    print(lru.delete(1) is True and lru.delete(1) is False)
+    lru.put(4, 4)
+    print(lru.get(4) == 4 and lru.get(3) == 3 and len(lru) == 2)
+
+    # randomized comparison against LRUCache, including colliding and negative keys
+    rng = random.Random(0)
+    compact, reference = CompactLRUCache(64), LRUCache(64)
+    agree = True
+    for _ in range(50_000):
+        key = rng.randrange(-200, 200) * 1024
+        if rng.random() < 0.5:
+            agree &= compact.get(key) == reference.get(key)
+        else:
+            compact.put(key, key + 1)
+            reference.put(key, key + 1)
+    print(agree)
+
+    n = 200_000
+    print(f"\n=== Memory per entry, n={n:,} ===")
+    print(f"OrderedDict LRUCache: {bytes_per_entry(LRUCache, n):.1f} bytes")
+    print(f"CompactLRUCache:      {bytes_per_entry(CompactLRUCache, n):.1f} bytes")
+
+    keys = [rng.randrange(1 << 40) for _ in range(n)]
+    print(f"\n=== Latency per op (ns), n={n:,} ===")
+    for name, cache in (("OrderedDict LRUCache", LRUCache(n)), ("CompactLRUCache", CompactLRUCache(n))):
+        get_ns, put_ns = latency_ns(cache, keys)
+        print(f"{name:20s} get={get_ns:.0f} put={put_ns:.0f}")
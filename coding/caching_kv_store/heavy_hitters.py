@@ -0,0 +1,189 @@
+# Approximate Heavy Hitters (Count-Min Sketch + Space-Saving)
+
+# Problem Statement:
+# `TopKScoresTracker` keeps an exact per-player dict, which does not fit for event-count
+# leaderboards with hundreds of millions of distinct ids. Track the heaviest ids approximately:
+#   - Count-Min Sketch, width ceil(e / epsilon) and depth ceil(ln(1 / delta)), estimates any id's count
+#   - Space-Saving keeps ceil(1 / epsilon) monitored ids and is what `top_k` reads
+# Error bounds, with N = total of all deltas (deltas must be positive):
+#   - estimate(x) never undercounts, and overcounts by at most epsilon * N with probability >= 1 - delta
+#   - every id whose true count exceeds epsilon * N is in the Space-Saving summary
+# Summaries built with the same epsilon/delta on different shards merge into one.
+
+# Examples:
+# 1. `hh = ApproxTopKScoresTracker(epsilon=0.01); hh.add_score("bob", 5); hh.estimate("bob")` → `5`
+# 2. `a.merge(b)` → counts as if one tracker had seen both streams (within the bounds above)
+
+from array import array
+import bisect
+import hashlib
+import heapq
+import math
+import random
+
+from top_k_scores import TopKScoresTracker
+
+
+class CountMinSketch:
+    def __init__(self, epsilon: float, delta: float):
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = array("q", [0]) * (self.width * self.depth)
+
+    def _indexes(self, key: str) -> list[int]:
+        # stable hash (not hash()) so sketches built in different processes line up for merge;
+        # rows use double hashing h1 + i * h2
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        width = self.width
+        return [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+
+    def add(self, key: str, count: int) -> None:
+        table = self.table
+        for i in self._indexes(key):
+            table[i] += count
+
+    def estimate(self, key: str) -> int:
+        table = self.table
+        return min([table[i] for i in self._indexes(key)])
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("can only merge sketches with the same epsilon and delta")
+        table = self.table
+        for i, count in enumerate(other.table):
+            table[i] += count
+
+
+class SpaceSaving:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts = {}   # id -> count (an overestimate)
+        self.errors = {}   # id -> max overestimate inherited when it replaced another id
+        self.heap = []     # lazy (count, id) min-heap; stale entries are skipped
+
+    def add(self, key: str, count: int) -> None:
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            # evict the minimum and let the newcomer inherit its count as error
+            floor, victim = self._pop_min()
+            del self.counts[victim], self.errors[victim]
+            self.counts[key] = floor + count
+            self.errors[key] = floor
+        heapq.heappush(self.heap, (self.counts[key], key))
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(c, k) for k, c in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def _pop_min(self) -> tuple[int, str]:
+        while True:
+            count, key = heapq.heappop(self.heap)
+            if self.counts.get(key) == count:
+                return count, key
+
+    def min_count(self) -> int:
+        if len(self.counts) < self.capacity:
+            return 0  # not full: unmonitored ids have never been seen
+        while True:
+            count, key = self.heap[0]
+            if self.counts.get(key) == count:
+                return count
+            heapq.heappop(self.heap)
+
+    def merge(self, other: "SpaceSaving") -> None:
+        # An id missing from one summary may still have up to that summary's min count there.
+        mine, theirs = self.min_count(), other.min_count()
+        merged = {}
+        for key in self.counts.keys() | other.counts.keys():
+            count = self.counts.get(key, mine) + other.counts.get(key, theirs)
+            error = self.errors.get(key, mine) + other.errors.get(key, theirs)
+            merged[key] = (count, error)
+        kept = heapq.nlargest(self.capacity, merged.items(), key=lambda item: item[1][0])
+        self.counts = {key: count for key, (count, _) in kept}
+        self.errors = {key: error for key, (_, error) in kept}
+        self.heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self.heap)
+
+
+class ApproxTopKScoresTracker:
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.total = 0
+        self.sketch = CountMinSketch(epsilon, delta)
+        self.summary = SpaceSaving(math.ceil(1 / epsilon))
+
+    def add_score(self, player_id: str, delta: int) -> None:
+        if delta <= 0:
+            raise ValueError("approximate mode only supports positive deltas (event counts)")
+        self.total += delta
+        self.sketch.add(player_id, delta)
+        self.summary.add(player_id, delta)
+
+    def estimate(self, player_id: str) -> int:
+        # both structures only overcount, so the smaller answer is the tighter one
+        estimate = self.sketch.estimate(player_id)
+        if player_id in self.summary.counts:
+            estimate = min(estimate, self.summary.counts[player_id])
+        return estimate
+
+    def error_bound(self) -> float:
+        return self.epsilon * self.total
+
+    def top_k(self, k: int) -> list[str]:
+        ranked = sorted(self.summary.counts, key=lambda player: (-self.estimate(player), player))
+        return ranked[:k]
+
+    def merge(self, other: "ApproxTopKScoresTracker") -> None:
+        if (self.epsilon, self.delta) != (other.epsilon, other.delta):
+            raise ValueError("can only merge trackers with the same epsilon and delta")
+        self.total += other.total
+        self.sketch.merge(other.sketch)
+        self.summary.merge(other.summary)
+
+
+def zipf_events(num_ids: int, length: int, s: float = 1.1, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    cdf = []
+    total = 0.0
+    for rank in range(1, num_ids + 1):
+        total += 1.0 / rank ** s
+        cdf.append(total)
+    return [f"id{bisect.bisect_left(cdf, rng.random() * total)}" for _ in range(length)]
+
+
+if __name__ == "__main__":
+    hh = ApproxTopKScoresTracker(epsilon=0.01)
+    hh.add_score("bob", 5)
+    hh.add_score("alice", 3)
+    print(hh.estimate("bob") == 5 and hh.top_k(2) == ["bob", "alice"])
+
+    # accuracy against the exact tracker on a skewed stream
+    events = zipf_events(50_000, 200_000)
+    exact = TopKScoresTracker()
+    approx = ApproxTopKScoresTracker(epsilon=0.001, delta=0.01)
+    for player in events:
+        exact.add_score(player, 1)
+        approx.add_score(player, 1)
+    bound = approx.error_bound()
+    print(all(0 <= approx.estimate(p) - exact.kv[p] <= bound for p in list(exact.kv)[:5_000]))
+    heavy = [p for p, count in exact.kv.items() if count > bound]
+    print(all(p in approx.summary.counts for p in heavy))
+    print(set(approx.top_k(20)) == set(exact.top_k(20)))
+
+    # shards merge: two workers each see half of the stream
+    left, right = ApproxTopKScoresTracker(0.001, 0.01), ApproxTopKScoresTracker(0.001, 0.01)
+    for i, player in enumerate(events):
+        (left if i % 2 else right).add_score(player, 1)
+    left.merge(right)
+    print(left.total == approx.total)
+    print(all(0 <= left.estimate(p) - exact.kv[p] <= left.error_bound() for p in heavy))
+    print(set(left.top_k(20)) == set(exact.top_k(20)))
+
+    print(f"\nmonitored ids: {len(approx.summary.counts):,} of {len(exact.kv):,} distinct, "
+          f"sketch cells: {len(approx.sketch.table):,}, error bound: {bound:.0f} of N={approx.total:,}")
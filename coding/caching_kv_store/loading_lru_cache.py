@@ -0,0 +1,255 @@
+# Read-Through LRU Cache (single-flight loads + bulk get_many/put_many)
+
+# Problem Statement:
+# A miss in `LRUCache.get` just returns -1, so every caller goes to the backing store on its own
+# and a hot-key miss stampedes the database.
+# Add a loader-backed mode:
+#   - `get(key)` loads misses through `loader(key)`; concurrent misses on the same key wait on
+#     one in-flight load (single flight) instead of each calling the loader
+#   - `get_many(keys)` sends all of its misses to `bulk_loader(keys)` in one batched call
+#   - `put_many(items)` stores several entries under one lock acquisition
+
+# Examples:
+# 1. `cache = LoadingLRUCache(2, loader=db.fetch)`; 10 threads call `get(7)` at once → `db.fetch(7)` runs once
+# 2. `get_many([1, 2, 3])` with 1 cached → `bulk_loader([2, 3])` called once
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.superseded = False   # a put landed during the load; its result must not be cached
+
+
+class LoadingLRUCache:
+    def __init__(self, capacity: int, loader=None, bulk_loader=None):
+        self.capacity = capacity
+        self.loader = loader            # key -> value
+        self.bulk_loader = bulk_loader  # list[key] -> dict[key, value]
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.in_flight = {}             # key -> InFlight
+        self.loads = 0
+
+    def _get_cached(self, key):
+        # caller holds self.lock
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return True, self.cache[key]
+        return False, None
+
+    def _put(self, key, value) -> None:
+        # caller holds self.lock
+        flight = self.in_flight.get(key)
+        if flight is not None:
+            flight.superseded = True   # the loader read an older value than this one
+        self._store(key, value)
+
+    def _store(self, key, value) -> None:
+        # caller holds self.lock
+        if key in self.cache:
+            self.cache.move_to_end(key)
+        elif len(self.cache) >= self.capacity:
+            self.cache.popitem(last=False)
+        self.cache[key] = value
+
+    def _store_loaded(self, key, flight: InFlight) -> None:
+        # caller holds self.lock; -1 means "not found", so it is never cached
+        if flight.error is None and flight.value != -1 and not flight.superseded:
+            self._store(key, flight.value)
+
+    def get(self, key):
+        with self.lock:
+            found, value = self._get_cached(key)
+            if found:
+                return value
+            if self.loader is None and self.bulk_loader is None:
+                return -1
+            flight = self.in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.in_flight[key] = InFlight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        # only the leader calls the loader, outside the lock so other keys are not blocked
+        try:
+            flight.value = self._load_one(key)
+        except Exception as e:
+            flight.error = e
+        with self.lock:
+            self.loads += 1
+            self._store_loaded(key, flight)
+            del self.in_flight[key]
+        flight.done.set()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _load_one(self, key):
+        if self.loader is not None:
+            return self.loader(key)
+        return self.bulk_loader([key]).get(key, -1)
+
+    def put(self, key, value) -> None:
+        with self.lock:
+            self._put(key, value)
+
+    def put_many(self, items) -> None:
+        with self.lock:
+            for key, value in items:
+                self._put(key, value)
+
+    def get_many(self, keys) -> dict:
+        results = {}
+        missing = []
+        waiting = {}   # key -> InFlight started by another caller
+        leading = {}   # key -> InFlight started by this call
+        with self.lock:
+            for key in keys:
+                if key in results or key in waiting or key in leading:
+                    continue
+                found, value = self._get_cached(key)
+                if found:
+                    results[key] = value
+                elif key in self.in_flight:
+                    waiting[key] = self.in_flight[key]
+                elif self.bulk_loader is not None or self.loader is not None:
+                    leading[key] = self.in_flight[key] = InFlight()
+                    missing.append(key)
+                else:
+                    results[key] = -1
+
+        if missing:
+            error = None
+            try:
+                if self.bulk_loader is not None:
+                    loaded = self.bulk_loader(missing)
+                else:
+                    loaded = {key: self.loader(key) for key in missing}
+            except Exception as e:
+                loaded, error = {}, e
+            with self.lock:
+                self.loads += 1
+                for key in missing:
+                    flight = leading[key]
+                    if error is not None:
+                        flight.error = error
+                    else:
+                        flight.value = loaded.get(key, -1)   # -1: the bulk loader had no row
+                        self._store_loaded(key, flight)
+                    del self.in_flight[key]
+            for flight in leading.values():
+                flight.done.set()
+            if error is not None:
+                raise error
+            for key in missing:
+                results[key] = leading[key].value
+
+        for key, flight in waiting.items():
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            results[key] = flight.value
+        return results
+
+
+if __name__ == "__main__":
+    # without a loader it behaves like LRUCache
+    lru = LoadingLRUCache(2)
+    lru.put(1, 1)
+    lru.put(2, 2)
+    print(lru.get(1) == 1)
+    lru.put(3, 3)    # evicts key 2
+    print(lru.get(2) == -1)
+
+    # single flight: 10 concurrent misses on one key trigger one slow load
+    calls = []
+
+    def slow_loader(key):
+        calls.append(key)
+        time.sleep(0.05)
+        return key * 10
+
+    cache = LoadingLRUCache(10, loader=slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(7))) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(calls == [7] and results == [70] * 10)
+    print(cache.get(7) == 70 and calls == [7])   # now served from cache
+
+    # get_many sends all misses to the bulk loader in one call
+    batches = []
+
+    def bulk_loader(keys):
+        batches.append(list(keys))
+        return {k: k * 10 for k in keys if k != 99}
+
+    cache = LoadingLRUCache(10, bulk_loader=bulk_loader)
+    cache.put_many([(1, "cached")])
+    print(cache.get_many([1, 2, 3, 2, 99]) == {1: "cached", 2: 20, 3: 30, 99: -1})
+    print(batches == [[2, 3, 99]])
+    print(cache.get_many([2, 3]) == {2: 20, 3: 30} and len(batches) == 1)
+    print(cache.get(4) == 40 and batches[-1] == [4])   # get falls back to a batch of one
+    print(cache.get_many([98]) == {98: 98 * 10} and cache.get_many([99]) == {99: -1} and 99 not in cache.cache)
+
+    # a -1 from the bulk loader is not cached either
+    cache = LoadingLRUCache(10, bulk_loader=lambda keys: {k: -1 for k in keys})
+    print(cache.get_many([5]) == {5: -1} and 5 not in cache.cache and cache.get(5) == -1 and not cache.cache)
+
+    # a put that lands while a load is in flight is not overwritten by the older loaded value
+    started, release = threading.Event(), threading.Event()
+
+    def racing_loader(key):
+        started.set()
+        release.wait()
+        return "old"
+
+    cache = LoadingLRUCache(10, loader=racing_loader)
+    reader = threading.Thread(target=cache.get, args=(1,))
+    reader.start()
+    started.wait()
+    cache.put(1, "new")
+    release.set()
+    reader.join()
+    print(cache.get(1) == "new")
+
+    # loader errors propagate to every waiter and are not cached
+    def failing_loader(key):
+        raise KeyError(key)
+
+    cache = LoadingLRUCache(10, loader=failing_loader)
+    try:
+        cache.get(5)
+        print(False)
+    except KeyError:
+        print(5 not in cache.cache)
+
+    print("\n=== Stampede: 50 threads x 20 hot keys, loader takes 5ms ===")
+    db_hits = []
+
+    def db_loader(key):
+        db_hits.append(key)
+        time.sleep(0.005)
+        return key
+
+    cache = LoadingLRUCache(100, loader=db_loader)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=lambda: [cache.get(k) for k in range(20)]) for _ in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"gets=1000 loader_calls={len(db_hits)} elapsed={time.perf_counter() - start:.3f}s")
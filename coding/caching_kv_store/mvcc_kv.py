@@ -0,0 +1,248 @@
+# MVCC KV Store with Snapshot Isolation
+
+# Problem Statement:
+# `TxnKV` keeps one global `sessions` stack for every caller, so two threads calling `begin()`
+# corrupt each other's transactions. Build a multi-version store instead:
+#   - each thread/client opens its own `Transaction` with a snapshot timestamp and sees the
+#     store exactly as of that timestamp, plus its own writes
+#   - readers never block: reads only look at committed, immutable versions
+#   - writes are buffered; at commit a write-write conflict with anything committed after the
+#     snapshot aborts the transaction (first committer wins)
+#   - versions that no active snapshot can see any more are garbage-collected
+
+# Examples:
+# 1. `t1 = store.begin(); t2 = store.begin(); t1.set("a", 1); t1.commit(); t2.get("a")` → `None` (t2's snapshot is older)
+# 2. `t1.set("a", 1); t2.set("a", 2); t1.commit(); t2.commit()` → `WriteConflict` on t2
+
+import bisect
+import random
+import threading
+import time
+
+TOMBSTONE = None
+
+
+class WriteConflict(Exception):
+    pass
+
+
+class Transaction:
+    def __init__(self, store: "MVCCStore", start_ts: int):
+        self.store = store
+        self.start_ts = start_ts
+        self.writes = {}
+        self.active = True
+
+    def get(self, key: str) -> object | None:
+        # after commit/rollback the snapshot is released and GC may trim what it needs
+        if not self.active:
+            raise Exception("Error: transaction already finished!")
+        if key in self.writes:
+            return self.writes[key]
+        return self.store.read(key, self.start_ts)
+
+    def set(self, key: str, val) -> None:
+        if not self.active:
+            raise Exception("Error: transaction already finished!")
+        self.writes[key] = val
+
+    def delete(self, key: str) -> None:
+        self.set(key, TOMBSTONE)
+
+    def commit(self) -> int:
+        if not self.active:
+            raise Exception("Error: transaction already finished!")
+        self.active = False
+        return self.store.commit(self)
+
+    def rollback(self) -> None:
+        if self.active:
+            self.active = False
+            self.store.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and self.active:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+class MVCCStore:
+    def __init__(self, gc_every: int = 1_000):
+        # key -> list of (commit_ts, value), oldest first. Committers only append or swap in a
+        # trimmed copy, so a reader holding the old list always sees a consistent history.
+        self.versions = {}
+        self.last_committed = 0
+        self.lock = threading.Lock()       # commit / begin bookkeeping only, never taken by reads
+        self.snapshots = {}                # start_ts -> number of active transactions
+        self.gc_every = gc_every
+        self.gc_candidates = set()         # keys with more than one version or a tombstone
+        self.commits = 0
+        self.aborts = 0                    # write-write conflicts
+
+    def begin(self) -> Transaction:
+        with self.lock:
+            start_ts = self.last_committed
+            self.snapshots[start_ts] = self.snapshots.get(start_ts, 0) + 1
+        return Transaction(self, start_ts)
+
+    def read(self, key: str, ts: int) -> object | None:
+        versions = self.versions.get(key)
+        if not versions:
+            return None
+        idx = bisect.bisect_right(versions, ts, key=lambda version: version[0])
+        return versions[idx - 1][1] if idx else None
+
+    def _release_locked(self, txn: Transaction) -> None:
+        count = self.snapshots[txn.start_ts] - 1
+        if count:
+            self.snapshots[txn.start_ts] = count
+        else:
+            del self.snapshots[txn.start_ts]
+
+    def release(self, txn: Transaction) -> None:
+        with self.lock:
+            self._release_locked(txn)
+
+    def commit(self, txn: Transaction) -> int:
+        with self.lock:
+            self._release_locked(txn)
+            for key in txn.writes:
+                versions = self.versions.get(key)
+                if versions and versions[-1][0] > txn.start_ts:
+                    self.aborts += 1
+                    raise WriteConflict(f"{key!r} was committed by another transaction after ts {txn.start_ts}")
+            commit_ts = self.last_committed + 1
+            for key, val in txn.writes.items():
+                versions = self.versions.setdefault(key, [])
+                versions.append((commit_ts, val))
+                if len(versions) > 1 or val is TOMBSTONE:
+                    self.gc_candidates.add(key)
+            self.last_committed = commit_ts   # publish only after every version is in place
+            self.commits += 1
+            if self.commits % self.gc_every == 0:
+                self._gc_locked()
+            return commit_ts
+
+    def gc(self) -> int:
+        with self.lock:
+            return self._gc_locked()
+
+    def _gc_locked(self) -> int:
+        # The oldest active snapshot sees, for every key, the newest version at or below it;
+        # anything older than that version is invisible to everyone.
+        horizon = min(self.snapshots, default=self.last_committed)
+        removed = 0
+        for key in list(self.gc_candidates):
+            versions = self.versions[key]
+            keep_from = bisect.bisect_right(versions, horizon, key=lambda version: version[0]) - 1
+            if keep_from > 0:
+                versions = versions[keep_from:]   # new list, readers keep the old one
+                removed += keep_from
+                self.versions[key] = versions
+            if len(versions) == 1:
+                commit_ts, val = versions[0]
+                if val is not TOMBSTONE:
+                    self.gc_candidates.discard(key)
+                elif commit_ts <= horizon:
+                    # a lone tombstone every snapshot can see reads the same as a missing key
+                    del self.versions[key]
+                    self.gc_candidates.discard(key)
+                    removed += 1
+        return removed
+
+
+def benchmark(num_threads: int, txns_per_thread: int = 5_000, num_keys: int = 10_000) -> tuple[float, float]:
+    """Each transaction reads 4 random keys and increments one; conflicts are retried."""
+    store = MVCCStore()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(txns_per_thread):
+            while True:
+                txn = store.begin()
+                for _ in range(4):
+                    txn.get(f"k{rng.randrange(num_keys)}")
+                key = f"k{rng.randrange(num_keys)}"
+                txn.set(key, (txn.get(key) or 0) + 1)
+                try:
+                    txn.commit()
+                    break
+                except WriteConflict:
+                    continue
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    total = sum(store.read(f"k{i}", store.last_committed) or 0 for i in range(num_keys))
+    assert total == num_threads * txns_per_thread, "lost update"
+    return store.commits / elapsed, store.aborts / (store.commits + store.aborts)
+
+
+if __name__ == "__main__":
+    store = MVCCStore()
+    t1, t2 = store.begin(), store.begin()
+    t1.set("a", 1)
+    t1.commit()
+    print(t2.get("a") is None)                    # t2 still reads its snapshot
+    print(store.begin().get("a") == 1)            # a new snapshot sees the commit
+
+    t1, t2 = store.begin(), store.begin()
+    t1.set("a", 2)
+    t2.set("a", 3)
+    t1.commit()
+    try:
+        t2.commit()
+        print(False)
+    except WriteConflict:
+        print(True)                               # first committer wins
+
+    # own writes are visible, deletes are tombstones
+    with store.begin() as txn:
+        txn.delete("a")
+        print(txn.get("a") is None)
+    print(store.read("a", store.last_committed) is None)
+
+    # GC keeps what the oldest snapshot needs and drops the rest
+    store = MVCCStore(gc_every=10**9)
+    for i in range(5):
+        with store.begin() as txn:
+            txn.set("k", i)
+    reader = store.begin()
+    for i in range(5, 10):
+        with store.begin() as txn:
+            txn.set("k", i)
+    store.gc()
+    print(reader.get("k") == 4 and len(store.versions["k"]) == 6)
+    reader.rollback()
+    store.gc()
+    print(store.versions["k"] == [(10, 9)])
+    try:
+        reader.get("k")                           # its snapshot is gone, reads must not guess
+        print(False)
+    except Exception:
+        print(True)
+
+    # deleted keys are dropped once no snapshot can still see an older version
+    reader = store.begin()
+    with store.begin() as txn:
+        txn.delete("k")
+        txn.delete("never-set")
+    store.gc()
+    print(reader.get("k") == 9 and "k" in store.versions)   # tombstone newer than the reader
+    reader.rollback()
+    store.gc()
+    print("k" not in store.versions and "never-set" not in store.versions and not store.gc_candidates)
+
+    print("\n=== Read-4/increment-1 transactions, 10k keys ===")
+    for num_threads in (1, 4, 8):
+        throughput, abort_rate = benchmark(num_threads)
+        print(f"threads={num_threads}: {throughput:,.0f} commits/sec, abort rate {abort_rate:.2%}")
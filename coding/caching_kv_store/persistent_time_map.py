@@ -0,0 +1,389 @@
+# Persistent TimeMap (immutable mmap segments + memtable)
+
+# Problem Statement:
+# `TimeMap` lives only in memory, so after every deploy it is rebuilt from the upstream log.
+# Persist it as an LSM-style store:
+#   - `set` writes go to an in-memory memtable (a TimeMap) that is flushed to a new segment file
+#     once it holds `memtable_limit` versions
+#   - segments are immutable files sorted by (key, timestamp) with a sorted key directory,
+#     opened with `mmap`; `get` binary-searches the on-disk columns without loading them
+#   - a background thread merges segments once there are `merge_threshold` of them
+# Opening the store only parses one fixed-size header per segment, so restart time depends on
+# the number of segments, not on the amount of data.
+# Unflushed memtable writes are not durable; after a crash they are replayed from the upstream log.
+
+# Examples:
+# 1. `tm = PersistentTimeMap(path); tm.set("foo", "bar", 1); tm.flush(); tm.close()`
+# 2. `PersistentTimeMap(path).get("foo", 3)` → `"bar"` (served from the mmap'd segment)
+
+import bisect
+import heapq
+import mmap
+import os
+import random
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from array import array
+
+from time_map import TimeMap
+
+MAGIC = b"TMSEG001"
+# magic, num_keys, num_rows, then byte offsets of: key_offsets, key_rows, timestamps, value_offsets,
+# key_blob, value_blob
+HEADER = struct.Struct("<8sqqqqqqqq")
+
+
+def write_segment(path: str, rows) -> None:
+    """Write (key, timestamp, value) rows, sorted by (key bytes, timestamp), as one segment file."""
+    key_offsets, key_rows = array("q", [0]), array("q", [0])
+    timestamps, value_offsets = array("q"), array("q", [0])
+    key_blob, value_blob = bytearray(), bytearray()
+    last_key = None
+    for key, ts, value in rows:
+        if key != last_key:
+            if last_key is not None:
+                key_rows.append(len(timestamps))
+            key_blob += key.encode()
+            key_offsets.append(len(key_blob))
+            last_key = key
+        timestamps.append(ts)
+        value_blob += value.encode()
+        value_offsets.append(len(value_blob))
+    if last_key is not None:
+        key_rows.append(len(timestamps))
+
+    num_keys, num_rows = len(key_offsets) - 1, len(timestamps)
+    pos = HEADER.size
+    sections = []
+    for column in (key_offsets, key_rows, timestamps, value_offsets, key_blob, value_blob):
+        sections.append(pos)
+        pos += len(column) * (8 if isinstance(column, array) else 1)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, num_keys, num_rows, *sections))
+        for column in (key_offsets, key_rows, timestamps, value_offsets):
+            f.write(column.tobytes())
+        f.write(key_blob)
+        f.write(value_blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)  # a segment is either complete or absent
+
+
+class Segment:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.num_keys, self.num_rows, ko, kr, ts, vo, kb, vb) = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a TimeMap segment")
+        self.refs = 0          # readers and merges using this segment; guarded by the store's lock
+        self.retired = False   # replaced by a merge; closed once the last reader lets go
+        view = self.view = memoryview(self.mm)
+        # zero-copy int64 views over the mapped file; pages are faulted in on demand
+        self.key_offsets = view[ko:ko + 8 * (self.num_keys + 1)].cast("q")
+        self.key_rows = view[kr:kr + 8 * (self.num_keys + 1)].cast("q")
+        self.timestamps = view[ts:ts + 8 * self.num_rows].cast("q")
+        self.value_offsets = view[vo:vo + 8 * (self.num_rows + 1)].cast("q")
+        self.key_blob, self.value_blob = kb, vb
+
+    def _key(self, i: int) -> bytes:
+        return self.mm[self.key_blob + self.key_offsets[i]:self.key_blob + self.key_offsets[i + 1]]
+
+    def _value(self, row: int) -> str:
+        start = self.value_blob + self.value_offsets[row]
+        return self.mm[start:self.value_blob + self.value_offsets[row + 1]].decode()
+
+    def _find_key(self, key: bytes) -> int:
+        lo, hi = 0, self.num_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.num_keys and self._key(lo) == key else -1
+
+    def lookup(self, key: str, timestamp: int):
+        """Return (timestamp, value) of the latest version <= timestamp, or None."""
+        i = self._find_key(key.encode())
+        if i < 0:
+            return None
+        lo, hi = self.key_rows[i], self.key_rows[i + 1]
+        row = bisect.bisect_right(self.timestamps, timestamp, lo, hi) - 1
+        if row < lo:
+            return None
+        return self.timestamps[row], self._value(row)
+
+    def close(self) -> None:
+        for column in (self.key_offsets, self.key_rows, self.timestamps, self.value_offsets, self.view):
+            column.release()
+        self.mm.close()
+
+    def rows(self):
+        """Yield every (key, timestamp, value) in file order."""
+        for i in range(self.num_keys):
+            key = self._key(i).decode()
+            for row in range(self.key_rows[i], self.key_rows[i + 1]):
+                yield key, self.timestamps[row], self._value(row)
+
+
+class PersistentTimeMap:
+    def __init__(self, directory: str, memtable_limit: int = 100_000, merge_threshold: int = 4):
+        self.directory = directory
+        self.memtable_limit = memtable_limit
+        self.merge_threshold = merge_threshold
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.memtable = TimeMap()
+        self.memtable_rows = 0
+        self.merge_thread = None
+
+        # segment files are named seg-<seq>-<generation>.tms; higher (seq, gen) is newer.
+        # Flushes use generation 0, merges take fresh generations so names never collide.
+        self.segments = []  # oldest first; replaced wholesale, never mutated in place
+        self.next_seq, self.next_gen = 0, 1
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(directory, name))  # interrupted flush or merge
+            elif name.startswith("seg-") and name.endswith(".tms"):
+                seq, gen = (int(part) for part in name[4:-4].split("-"))
+                self.segments.append(((seq, gen), Segment(os.path.join(directory, name))))
+                self.next_seq, self.next_gen = max(self.next_seq, seq + 1), max(self.next_gen, gen + 1)
+        self.segments.sort(key=lambda entry: entry[0])
+
+    def __enter__(self) -> "PersistentTimeMap":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _pin(self, segments) -> None:
+        # caller holds self.lock
+        for _, segment in segments:
+            segment.refs += 1
+
+    def _unpin(self, segments) -> None:
+        with self.lock:
+            for _, segment in segments:
+                segment.refs -= 1
+                if segment.retired and segment.refs == 0:
+                    segment.close()
+
+    def get(self, key: str, timestamp: int) -> str:
+        best_ts, best_value = None, ""
+        with self.lock:
+            # set() appends to the memtable's parallel columns and flush() swaps it out under this
+            # lock, so read it here; segments are only pinned and searched outside the lock
+            series = self.memtable.store.get(key)
+            if series is not None:
+                idx = bisect.bisect_right(series.timestamps, timestamp, lo=series.start)
+                if idx > series.start:
+                    best_ts, best_value = series.timestamps[idx - 1], series.values[idx - 1]
+            segments = self.segments
+            self._pin(segments)
+        try:
+            # newest segment first: on equal timestamps the newer write wins
+            for _, segment in reversed(segments):
+                found = segment.lookup(key, timestamp)
+                if found is not None and (best_ts is None or found[0] > best_ts):
+                    best_ts, best_value = found
+        finally:
+            self._unpin(segments)
+        return best_value
+
+    def set(self, key: str, val: str, timestamp: int) -> None:
+        with self.lock:
+            self.memtable.set(key, val, timestamp)
+            self.memtable_rows += 1
+            if self.memtable_rows >= self.memtable_limit:
+                self._flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        # caller holds self.lock
+        if self.memtable_rows == 0:
+            return
+        rows = []
+        for key in sorted(self.memtable.store, key=str.encode):
+            series = self.memtable.store[key]
+            for i in range(series.start, len(series.timestamps)):
+                rows.append((key, series.timestamps[i], series.values[i]))
+        seq = self.next_seq
+        self.next_seq += 1
+        path = os.path.join(self.directory, f"seg-{seq:012d}-{0:06d}.tms")
+        write_segment(path, rows)
+        self.segments = self.segments + [((seq, 0), Segment(path))]
+        self.memtable, self.memtable_rows = TimeMap(), 0
+
+        if len(self.segments) >= self.merge_threshold and self.merge_thread is None:
+            inputs = list(self.segments)
+            self._pin(inputs)   # the merge reads them after the lock is released
+            self.merge_thread = threading.Thread(target=self._merge, args=(inputs,), daemon=True)
+            self.merge_thread.start()
+
+    def _merge(self, inputs) -> None:
+        # k-way merge by (key, timestamp); for duplicates keep the version from the newest segment
+        def tagged(seg, rank):
+            # rank is bound per call; a generator expression in the comprehension would see only the last one
+            return ((k.encode(), ts, -rank, v) for k, ts, v in seg.rows())
+
+        streams = [tagged(seg, rank) for rank, (_, seg) in enumerate(inputs)]
+
+        def deduped():
+            last = None
+            for key, ts, _, value in heapq.merge(*streams):
+                if (key, ts) != last:
+                    last = (key, ts)
+                    yield key.decode(), ts, value
+
+        seq = inputs[-1][0][0]
+        with self.lock:
+            gen = self.next_gen
+            self.next_gen += 1
+        path = os.path.join(self.directory, f"seg-{seq:012d}-{gen:06d}.tms")
+        write_segment(path, deduped())
+        merged = Segment(path)
+        merged_ids = {ident for ident, _ in inputs}
+        with self.lock:
+            # segments flushed while merging are newer than every input and stay after it
+            newer = [entry for entry in self.segments if entry[0] not in merged_ids]
+            self.segments = [((seq, gen), merged)] + newer
+            self.merge_thread = None
+            for _, segment in inputs:
+                segment.retired = True
+        for _, segment in inputs:
+            os.remove(segment.path)  # open mappings stay valid for in-flight readers
+        self._unpin(inputs)          # unmapped once no reader still holds them
+
+    def wait_for_merge(self) -> None:
+        thread = self.merge_thread
+        if thread is not None:
+            thread.join()
+
+    def close(self) -> None:
+        """Flush the memtable, wait for a running merge and unmap every segment."""
+        self.flush()
+        self.wait_for_merge()
+        with self.lock:
+            segments, self.segments = self.segments, []
+        for _, segment in segments:
+            segment.close()
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    try:
+        tm = PersistentTimeMap(directory, memtable_limit=2, merge_threshold=100)
+        tm.set("foo", "bar", 1)
+        print(tm.get("foo", 1) == "bar")          # from the memtable
+        tm.set("foo", "bar2", 4)                  # reaches memtable_limit, flushes a segment
+        tm.set("baz", "qux", 2)
+        print(tm.get("foo", 3) == "bar" and tm.get("foo", 5) == "bar2" and tm.get("baz", 2) == "qux")
+        tm.close()
+
+        # restart: only segment headers are read
+        tm = PersistentTimeMap(directory, memtable_limit=2, merge_threshold=100)
+        print(len(tm.segments) == 2)
+        print(tm.get("foo", 3) == "bar" and tm.get("foo", 5) == "bar2" and tm.get("baz", 9) == "qux")
+        print(tm.get("foo", 0) == "" and tm.get("missing", 5) == "")
+
+        # a newer write to the same (key, timestamp) shadows the older segment
+        tm.set("foo", "bar2-fixed", 4)
+        tm.flush()
+        print(tm.get("foo", 4) == "bar2-fixed")
+        tm.close()
+    finally:
+        shutil.rmtree(directory)
+
+    # overwrites of one (key, timestamp) across merged segments keep the newest value,
+    # even when an older value sorts before it
+    directory = tempfile.mkdtemp()
+    try:
+        tm = PersistentTimeMap(directory, memtable_limit=1, merge_threshold=2)
+        for val in ("a-old", "m-mid", "z-new"):
+            tm.set("dup", val, 7)                 # flushes at once; every second segment merges
+            tm.wait_for_merge()
+        print(tm.get("dup", 7) == "z-new")
+        tm.close()
+        with PersistentTimeMap(directory) as tm:
+            print(len(tm.segments) == 1 and tm.get("dup", 7) == "z-new")
+    finally:
+        shutil.rmtree(directory)
+
+    # background merge keeps answers identical and collapses segments
+    directory = tempfile.mkdtemp()
+    try:
+        reference = TimeMap()
+        tm = PersistentTimeMap(directory, memtable_limit=1_000, merge_threshold=4)
+        for i in range(20_000):
+            key, ts, val = f"k{i % 500}", i // 7, f"v{i}"
+            tm.set(key, val, ts)
+            reference.set(key, val, ts)
+        tm.close()
+        tm = PersistentTimeMap(directory)
+        probes = [(f"k{k}", ts) for k in range(0, 500, 37) for ts in range(0, 3_000, 97)]
+        print(all(tm.get(k, ts) == reference.get(k, ts) for k, ts in probes))
+        print(f"segments after merging: {len(tm.segments)}")
+        tm.close()
+
+        # readers racing a writer that flushes and merges: every answer is a real version,
+        # and segments replaced by merges get unmapped
+        path = os.path.join(directory, "concurrent")
+        tm = PersistentTimeMap(path, memtable_limit=50, merge_threshold=3)
+        stop = threading.Event()
+        errors = []
+
+        def reader():
+            rng = random.Random()
+            while not stop.is_set():
+                key, ts = f"c{rng.randrange(20)}", rng.randrange(5_000)
+                try:
+                    value = tm.get(key, ts)
+                except Exception as e:   # e.g. IndexError from a half-appended memtable row
+                    errors.append(e)
+                    return
+                if value and not (value.startswith(key + "@") and int(value.split("@")[1]) <= ts):
+                    errors.append(ValueError(f"{key}@{ts} -> {value}"))
+
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for t in readers:
+            t.start()
+        replaced = []
+        for i in range(5_000):
+            tm.set(f"c{i % 20}", f"c{i % 20}@{i}", i)
+            if i % 500 == 0:
+                replaced.extend(segment for _, segment in tm.segments)
+        stop.set()
+        for t in readers:
+            t.join()
+        tm.wait_for_merge()
+        live = {id(segment) for _, segment in tm.segments}
+        print(not errors and all(segment.mm.closed for segment in replaced if id(segment) not in live))
+        tm.close()
+
+        print("\n=== Restart time vs data size (segments are mmap'd, not loaded) ===")
+        for rows in (10_000, 100_000, 1_000_000):
+            path = os.path.join(directory, f"bench-{rows}")
+            os.makedirs(path)
+            write_segment(os.path.join(path, "seg-000000000000-000000.tms"),
+                          ((f"k{i // 1_000:08d}", i % 1_000, "x" * 16) for i in range(rows)))
+            start = time.perf_counter()
+            tm = PersistentTimeMap(path)
+            open_ms = (time.perf_counter() - start) * 1e3
+            start = time.perf_counter()
+            for i in range(10_000):
+                tm.get(f"k{(i * 7919) % (rows // 1_000):08d}", 500)
+            get_us = (time.perf_counter() - start) / 10_000 * 1e6
+            print(f"rows={rows:>9,}: open={open_ms:.2f} ms  get={get_us:.1f} us")
+            tm.close()
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,210 @@
+# Refresh-Ahead TTL Cache (stale-while-revalidate)
+
+# Problem Statement:
+# When a hot key expires in `TTLCache`, every caller misses at once and latency spikes.
+# Add a loader-based mode:
+#   - refresh-ahead: once an entry has used `refresh_ahead` (a fraction) of its TTL, the next read
+#     starts one background refresh and still returns the cached value
+#   - stale-while-revalidate: for `stale_grace_ms` after expiry the stale value is served while a
+#     refresh is in flight
+#   - past the grace period (or on a cold miss) the caller loads synchronously; concurrent misses on
+#     the same key share one load
+#   - counters for hits, stale hits, misses, refreshes and load latency
+#   - entries that nobody reads again are removed once past ttl + grace by a timing wheel, so
+#     write-once keys don't accumulate
+
+# Examples:
+# 1. `cache = RefreshingTTLCache(loader, ttl_ms=1000, refresh_ahead=0.8, stale_grace_ms=500)`
+# 2. `get("k", now_ms=0)` → loads synchronously; `get("k", now_ms=900)` → cached value + background refresh
+# 3. `get("k", now_ms=1200)` with a refresh in flight → stale value, no extra load
+
+import threading
+import time
+
+from loading_lru_cache import InFlight
+from ttl_cache import TimingWheel
+
+
+class RefreshingTTLCache:
+    def __init__(self, loader, ttl_ms: int = 1000, refresh_ahead: float = 0.8, stale_grace_ms: int = 0):
+        self.loader = loader
+        self.ttl = ttl_ms
+        self.refresh_ahead = refresh_ahead
+        self.stale_grace = stale_grace_ms
+        self.cache = {}        # key -> (value, loaded_at_ms)
+        self.in_flight = {}    # key -> InFlight, shared by sync loads and background refreshes
+        self.wheel = None      # one timer per key at the end of its grace period; created on first use
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0,
+                      "loads": 0, "load_errors": 0, "load_ms_total": 0.0}
+
+    def _now(self, now_ms):
+        return time.time() * 1000 if now_ms is None else now_ms
+
+    def _expire_locked(self, now_ms) -> int:
+        # caller holds self.lock
+        if self.wheel is None:
+            self.wheel = TimingWheel(start_tick=int(now_ms))
+        removed = 0
+        for key, _ in self.wheel.advance(int(now_ms)):
+            entry = self.cache.get(key)
+            if entry is None:
+                continue
+            if now_ms - entry[1] > self.ttl + self.stale_grace:
+                del self.cache[key]
+                removed += 1
+            else:
+                self._arm(key, entry[1])   # fired early: its load time was behind the wheel's clock
+        return removed
+
+    def _arm(self, key, loaded_at) -> None:
+        # caller holds self.lock; a refresh moves the key's timer rather than adding one
+        self.wheel.add(key, int(loaded_at + self.ttl + self.stale_grace) + 1)
+
+    def expire(self, now_ms: int | None = None) -> int:
+        """Remove every entry past ttl + grace; returns how many were removed."""
+        with self.lock:
+            return self._expire_locked(self._now(now_ms))
+
+    def _load(self, key, flight: InFlight, now_ms) -> None:
+        # now_ms is the caller's explicit clock (tests) or None for wall-clock time at completion
+        start = time.perf_counter()
+        try:
+            flight.value = self.loader(key)
+        except Exception as e:
+            flight.error = e
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.stats["loads"] += 1
+            self.stats["load_ms_total"] += elapsed_ms
+            if flight.error is None:
+                loaded_at = self._now(now_ms)
+                self.cache[key] = (flight.value, loaded_at)
+                if self.wheel is None:
+                    self.wheel = TimingWheel(start_tick=int(loaded_at))
+                self._arm(key, loaded_at)
+            else:
+                self.stats["load_errors"] += 1   # a failed refresh keeps serving the old value
+            del self.in_flight[key]
+        flight.done.set()
+
+    def get(self, key, now_ms: int | None = None):
+        clock_ms = now_ms
+        now_ms = self._now(now_ms)
+        refresh = None
+        with self.lock:
+            self._expire_locked(now_ms)
+            entry = self.cache.get(key)
+            if entry is not None:
+                value, loaded_at = entry
+                age = now_ms - loaded_at
+                if age <= self.ttl + self.stale_grace:
+                    stale = age > self.ttl
+                    self.stats["stale_hits" if stale else "hits"] += 1
+                    if (stale or age >= self.ttl * self.refresh_ahead) and key not in self.in_flight:
+                        refresh = self.in_flight[key] = InFlight()
+                        self.stats["refreshes"] += 1
+                    if refresh is None:
+                        return value
+            if refresh is None:
+                # cold miss or too stale to serve: join the in-flight load or become its leader
+                self.cache.pop(key, None)
+                self.stats["misses"] += 1
+                flight = self.in_flight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self.in_flight[key] = InFlight()
+
+        if refresh is not None:
+            threading.Thread(target=self._load, args=(key, refresh, clock_ms), daemon=True).start()
+            return value
+
+        if leader:
+            self._load(key, flight, clock_ms)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def load_latency_ms(self) -> float:
+        loads = self.stats["loads"]
+        return self.stats["load_ms_total"] / loads if loads else 0.0
+
+
+if __name__ == "__main__":
+    calls = []
+    release = threading.Event()
+
+    def loader(key):
+        calls.append(key)
+        if len(calls) > 1:
+            release.wait()     # hold background refreshes until the test lets them finish
+        return f"{key}-v{len(calls)}"
+
+    cache = RefreshingTTLCache(loader, ttl_ms=1000, refresh_ahead=0.8, stale_grace_ms=500)
+    print(cache.get("k", now_ms=0) == "k-v1")                        # cold miss, sync load
+    print(cache.get("k", now_ms=500) == "k-v1" and len(calls) == 1)  # fresh hit
+    print(cache.get("k", now_ms=900) == "k-v1")                      # refresh-ahead starts
+    print(cache.get("k", now_ms=950) == "k-v1" and cache.stats["refreshes"] == 1)  # only one refresh
+    release.set()
+    while cache.in_flight:
+        time.sleep(0.001)
+    print(cache.get("k", now_ms=1000) == "k-v2" and len(calls) == 2)
+
+    # stale-while-revalidate inside the grace period, sync load past it
+    release.clear()
+    print(cache.get("k", now_ms=2100) == "k-v2" and cache.stats["stale_hits"] == 1)
+    release.set()
+    while cache.in_flight:
+        time.sleep(0.001)
+    print(cache.get("k", now_ms=4000) == "k-v4" and cache.stats["misses"] == 2)
+
+    # concurrent cold misses share one load
+    loads = []
+
+    def slow_loader(key):
+        loads.append(key)
+        time.sleep(0.05)
+        return key
+
+    cache = RefreshingTTLCache(slow_loader, ttl_ms=1000)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("hot", now_ms=0))) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(loads == ["hot"] and results == ["hot"] * 20)
+
+    # write-once keys are dropped after ttl + grace even if never read again
+    cache = RefreshingTTLCache(lambda key: key, ttl_ms=100, stale_grace_ms=50)
+    for i in range(1_000):
+        cache.get(f"once-{i}", now_ms=i)
+    print(len(cache.cache) == 151 and cache.wheel.size == 151)   # loaded at 849..999 still live
+    print(cache.expire(now_ms=1_149) == 150 and list(cache.cache) == ["once-999"])
+    print(cache.expire(now_ms=1_150) == 1 and not cache.cache and cache.wheel.size == 0)
+
+    print("\n=== Hot key across expiry: 8 threads, ttl=50ms, loader takes 20ms ===")
+    for refresh_ahead, grace in ((1.0, 0), (0.8, 100)):
+        cache = RefreshingTTLCache(lambda key: time.sleep(0.02) or key, ttl_ms=50,
+                                   refresh_ahead=refresh_ahead, stale_grace_ms=grace)
+        worst = [0.0] * 8
+        stop = time.perf_counter() + 0.5
+
+        def reader(i):
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                cache.get("hot")
+                worst[i] = max(worst[i], time.perf_counter() - start)
+                time.sleep(0.001)   # the rest of the request
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        label = "plain expiry     " if refresh_ahead == 1.0 and grace == 0 else "refresh-ahead+SWR"
+        s = cache.stats
+        print(f"{label}: misses={s['misses']} refreshes={s['refreshes']} stale_hits={s['stale_hits']} "
+              f"avg_load={cache.load_latency_ms():.1f}ms worst_get={max(worst) * 1000:.1f}ms")
@@ -0,0 +1,133 @@
+# Sharded LRU Cache (lock striping)
+
+# Problem Statement:
+# `LRUCache` wraps a single OrderedDict with no locking, so concurrent callers have to put one
+# global mutex around it and every thread serializes on that lock.
+# Split the key space across N segments. Each segment is its own OrderedDict with its own lock
+# and its own slice of the total capacity, so threads touching different segments never contend.
+
+# Examples:
+# 1. `cache = ShardedLRUCache(4, num_shards=2)` → each shard holds 2 entries
+# 2. `put(1, 1); get(1)` → `1`
+# 3. `get(99)` → `-1` (not found)
+
+from collections import OrderedDict
+import threading
+import time
+import random
+
+from lru_cache import LRUCache
+
+
+class LRUShard:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: int) -> int:
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+            return -1
+
+    def put(self, key: int, value: int) -> None:
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+            elif len(self.cache) >= self.capacity:
+                self.cache.popitem(last=False)
+            self.cache[key] = value
+
+
+class ShardedLRUCache:
+    def __init__(self, capacity: int, num_shards: int = 16):
+        if num_shards < 1:
+            raise ValueError("num_shards must be >= 1")
+        num_shards = min(num_shards, max(capacity, 1))
+        self.capacity = capacity
+        self.num_shards = num_shards
+        # spread the remainder so the shard capacities add up to exactly `capacity`
+        base, extra = divmod(capacity, num_shards)
+        self.shards = [LRUShard(base + (1 if i < extra else 0)) for i in range(num_shards)]
+
+    def _shard(self, key: int) -> LRUShard:
+        return self.shards[hash(key) % self.num_shards]
+
+    def get(self, key: int) -> int:
+        return self._shard(key).get(key)
+
+    def put(self, key: int, value: int) -> None:
+        self._shard(key).put(key, value)
+
+    def __len__(self) -> int:
+        return sum(len(shard.cache) for shard in self.shards)
+
+
+class LockedLRUCache:
+    """Baseline: the plain LRUCache behind one global mutex."""
+
+    def __init__(self, capacity: int):
+        self.cache = LRUCache(capacity)
+        self.lock = threading.Lock()
+
+    def get(self, key: int) -> int:
+        with self.lock:
+            return self.cache.get(key)
+
+    def put(self, key: int, value: int) -> None:
+        with self.lock:
+            self.cache.put(key, value)
+
+
+def benchmark(cache, num_threads: int, ops_per_thread: int, key_space: int) -> float:
+    """Run a 90/10 get/put mix from `num_threads` threads and return ops/sec."""
+    def worker(seed):
+        rng = random.Random(seed)
+        keys = [rng.randrange(key_space) for _ in range(ops_per_thread)]
+        for key in keys:
+            if cache.get(key) == -1 or rng.random() < 0.1:
+                cache.put(key, key)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return num_threads * ops_per_thread / elapsed
+
+
+if __name__ == "__main__":
+    cache = ShardedLRUCache(4, num_shards=2)
+    print([shard.capacity for shard in cache.shards] == [2, 2])
+    cache.put(1, 1)
+    print(cache.get(1) == 1)
+    print(cache.get(99) == -1)
+
+    # a single shard behaves exactly like LRUCache
+    cache = ShardedLRUCache(2, num_shards=1)
+    cache.put(1, 1)
+    cache.put(2, 2)
+    print(cache.get(1) == 1)
+    cache.put(3, 3)    # evicts key 2
+    print(cache.get(2) == -1)
+
+    # capacity is respected across shards under concurrent writes
+    cache = ShardedLRUCache(100, num_shards=8)
+    threads = [threading.Thread(target=lambda s=s: [cache.put(s * 1000 + i, i) for i in range(500)]) for s in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(len(cache) <= 100)
+
+    print("\n=== Throughput (ops/sec), capacity=10_000, key_space=20_000 ===")
+    for num_threads in (1, 4, 8):
+        locked = benchmark(LockedLRUCache(10_000), num_threads, 50_000, 20_000)
+        sharded = benchmark(ShardedLRUCache(10_000, num_shards=16), num_threads, 50_000, 20_000)
+        print(f"threads={num_threads}: single-lock {locked:,.0f}  sharded {sharded:,.0f}")
+    # Note: under the GIL, pure-Python shards mostly remove lock convoying rather than adding
+    # parallelism; the gap widens on free-threaded builds or when values are expensive to produce.
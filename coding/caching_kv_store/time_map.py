@@ -7,37 +7,232 @@
 # 1. `set("foo", "bar", 1); get("foo", 1);` → `"bar"`
 # 2. `get("foo", 3);` → `"bar"`
 # 3. `set("foo", "bar2", 4); get("foo", 4); get("foo", 5);` → `"bar2"`, `"bar2"`
-from collections import defaultdict
+from array import array
 import bisect
+import random
+import time
+
+try:
+    import numpy as np
+except ImportError:  # get_many falls back to one bisect per query
+    np = None
+
+
+class Series:
+    """One key's history as parallel columns; versions before `start` are already dropped."""
+
+    __slots__ = ("timestamps", "values", "start")
 
-class TimeMap:
     def __init__(self):
-        self.store = defaultdict(list) # list so that we can loop through it
+        self.timestamps = array("q")
+        self.values = []
+        self.start = 0
+
+    def __len__(self) -> int:
+        return len(self.timestamps) - self.start
+
+
+class TimeMap:
+    def __init__(self, max_versions: int | None = None, max_age: int | None = None,
+                 bucket_size: int | None = None, sweep_batch: int = 2):
+        # Retention (all optional, combinable):
+        #   max_versions: keep only the last N versions of each key
+        #   max_age:      drop versions older than (newest timestamp seen - max_age)
+        #   bucket_size:  downsample, only the last value per timestamp bucket survives
+        self.max_versions = max_versions
+        self.max_age = max_age
+        self.bucket_size = bucket_size
+        self.sweep_batch = sweep_batch  # idle keys compacted per set, for max_age
+        self.watermark = None           # newest timestamp seen across all keys
+        self.store = {}                 # key -> Series
+        self._sweep = iter(())
 
     def get(self, key: str, timestamp: int) -> str:
         if key not in self.store:
             return ""
-        
-        # Binary search for the largest timestamp <= requested timestamp
-        timestamps_values = self.store[key]
-        
-        # Extract just timestamps for binary search
-        timestamps = [tv[0] for tv in timestamps_values]
-        
-        # Find insertion point
-        idx = bisect.bisect_right(timestamps, timestamp)
-        
-        # If idx is 0, no timestamp <= requested timestamp exists
-        if idx == 0:
+        series = self.store[key]
+
+        # Binary search directly on the timestamp column for the largest timestamp <= requested
+        idx = bisect.bisect_right(series.timestamps, timestamp, lo=series.start)
+
+        # If nothing retained is <= the requested timestamp there is no answer
+        if idx == series.start:
             return ""
-        
-        # Return the value at the largest timestamp <= requested timestamp
-        return timestamps_values[idx - 1][1]
+        return series.values[idx - 1]
+
+    def get_many(self, keys, timestamps) -> list[str]:
+        """Resolve many (key, timestamp) queries; results come back in input order.
+
+        Queries are grouped by key so each key's timestamp column is searched once with a
+        vectorized `np.searchsorted` instead of one Python-level bisect per query.
+        Float timestamps are floored first, which is what `get` answers for them too.
+        """
+        results = [""] * len(keys)
+        groups = {}  # key -> positions of its queries in the input
+        for i, key in enumerate(keys):
+            if key in self.store:
+                groups.setdefault(key, []).append(i)
+        if np is not None:
+            timestamps = np.asarray(timestamps)
+            if timestamps.dtype.kind == "f":
+                timestamps = np.floor(timestamps)  # an int64 cast would truncate toward zero
+            timestamps = timestamps.astype(np.int64)
+
+        for key, positions in groups.items():
+            series = self.store[key]
+            values, start = series.values, series.start
+            if np is not None:
+                # zero-copy view over the array('q') column
+                column = np.frombuffer(series.timestamps, dtype=np.int64)[start:]
+                try:
+                    idxs = np.searchsorted(column, timestamps[positions], side="right").tolist()
+                finally:
+                    del column  # release the buffer so the column can grow again
+            else:
+                idxs = [bisect.bisect_right(series.timestamps, timestamps[i], lo=start) - start
+                        for i in positions]
+            for pos, idx in zip(positions, idxs):
+                if idx:
+                    results[pos] = values[start + idx - 1]
+        return results
+
+    def set(self, key: str, val: str, timestamp: int) -> None:
+        if key not in self.store:
+            self.store[key] = Series()
+        series = self.store[key]
+        timestamps, values = series.timestamps, series.values
+        if self.watermark is None or timestamp > self.watermark:
+            self.watermark = timestamp
+
+        if self.bucket_size is not None and len(series):
+            self._set_downsampled(series, val, timestamp)
+        # Fast path: timestamps almost always arrive in order, so this is an O(1) append
+        elif len(series) == 0 or timestamp > timestamps[-1]:
+            timestamps.append(timestamp)
+            values.append(val)
+        else:
+            # Slow path: out-of-order write, O(n) insert; the same timestamp overwrites its value
+            idx = bisect.bisect_left(timestamps, timestamp, lo=series.start)
+            if idx < len(timestamps) and timestamps[idx] == timestamp:
+                values[idx] = val
+            else:
+                timestamps.insert(idx, timestamp)
+                values.insert(idx, val)
+
+        if self.max_versions is not None or self.max_age is not None:
+            self._compact(key, series)
+            self._sweep_step()
+
+    def _set_downsampled(self, series: Series, val: str, timestamp: int) -> None:
+        timestamps, values = series.timestamps, series.values
+        bucket = timestamp // self.bucket_size
+        if timestamp >= timestamps[-1]:
+            if timestamps[-1] // self.bucket_size == bucket:
+                timestamps[-1] = timestamp   # later value replaces the bucket's last value
+                values[-1] = val
+            else:
+                timestamps.append(timestamp)
+                values.append(val)
+            return
+        # out-of-order: only wins if it is the latest write seen for its bucket
+        idx = bisect.bisect_right(timestamps, timestamp, lo=series.start)
+        if idx < len(timestamps) and timestamps[idx] // self.bucket_size == bucket:
+            return
+        if idx > series.start and timestamps[idx - 1] // self.bucket_size == bucket:
+            timestamps[idx - 1] = timestamp
+            values[idx - 1] = val
+            return
+        timestamps.insert(idx, timestamp)
+        values.insert(idx, val)
+
+    def _compact(self, key: str, series: Series) -> None:
+        new_start = series.start
+        if self.max_versions is not None:
+            new_start = max(new_start, len(series.timestamps) - self.max_versions)
+        if self.max_age is not None:
+            cutoff = self.watermark - self.max_age
+            new_start = bisect.bisect_left(series.timestamps, cutoff, lo=new_start)
+        series.start = new_start
 
-    def set(self, key: str, val: str, timestamp: int) -> str:
-        bisect.insort(self.store[key], (timestamp, val))
-        return self.store[key]
+        if series.start == len(series.timestamps):
+            del self.store[key]
+        elif series.start > 32 and series.start * 2 > len(series.timestamps):
+            # Physically drop the dead prefix only once it is at least half the column,
+            # so each version is moved O(1) times overall (amortized like list growth).
+            del series.timestamps[:series.start]
+            del series.values[:series.start]
+            series.start = 0
 
+    def _sweep_step(self) -> None:
+        # Keys that stop receiving writes still need max_age applied: compact a few per set,
+        # round-robin over the key space.
+        if self.max_age is None:
+            return
+        for _ in range(self.sweep_batch):
+            key = next(self._sweep, None)
+            if key is None:
+                self._sweep = iter(list(self.store))
+                return
+            series = self.store.get(key)
+            if series is not None:
+                self._compact(key, series)
+
+    def range(self, key: str, t0: int, t1: int):
+        """Yield (timestamp, value) for versions with t0 <= timestamp < t1, oldest first."""
+        series = self.store.get(key)
+        if series is None:
+            return
+        timestamps, values = series.timestamps, series.values
+        lo = bisect.bisect_left(timestamps, t0, lo=series.start)
+        hi = bisect.bisect_left(timestamps, t1, lo=lo)
+        for i in range(lo, hi):
+            yield timestamps[i], values[i]
+
+    def snapshot(self, timestamp: int):
+        """Yield (key, value) as of `timestamp` for every key, streaming over the live store.
+
+        Nothing is copied, so the store must not be written while the snapshot is consumed.
+        """
+        for key, series in self.store.items():
+            idx = bisect.bisect_right(series.timestamps, timestamp, lo=series.start)
+            if idx > series.start:
+                yield key, series.values[idx - 1]
+
+
+def benchmark(history_lengths=(100, 1_000, 10_000, 100_000), queries: int = 20_000) -> None:
+    for n in history_lengths:
+        timemap = TimeMap()
+        start = time.perf_counter()
+        for ts in range(n):
+            timemap.set("k", "v", ts * 10)
+        set_ns = (time.perf_counter() - start) / n * 1e9
+
+        probes = [(i * 7919) % (n * 10) for i in range(queries)]
+        start = time.perf_counter()
+        for ts in probes:
+            timemap.get("k", ts)
+        get_ns = (time.perf_counter() - start) / queries * 1e9
+        print(f"history={n:>7,}: set={set_ns:6.0f} ns  get={get_ns:6.0f} ns")
+
+
+def benchmark_get_many(num_keys: int = 1_000, versions: int = 1_000, queries: int = 1_000_000) -> None:
+    timemap = TimeMap()
+    for key in range(num_keys):
+        for ts in range(versions):
+            timemap.set(key, ts, ts * 10)
+    rng = random.Random(0)
+    keys = [rng.randrange(num_keys) for _ in range(queries)]
+    timestamps = [rng.randrange(versions * 10) for _ in range(queries)]
+
+    start = time.perf_counter()
+    scalar = [timemap.get(k, ts) for k, ts in zip(keys, timestamps)]
+    scalar_s = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = timemap.get_many(keys, timestamps)
+    batched_s = time.perf_counter() - start
+    engine = "numpy" if np is not None else "bisect fallback"
+    print(f"queries={queries:,}: scalar loop {scalar_s:.2f}s  get_many ({engine}) {batched_s:.2f}s  "
+          f"same={scalar == batched}")
 
 
 if __name__ == "__main__":
@@ -47,4 +242,60 @@ if __name__ == "__main__":
     print(timemap.get("foo", 3))
     timemap.set("foo", "bar2", 4)
     print(timemap.get("foo", 4))
-    print(timemap.get("foo", 5))
\ No newline at end of file
+    print(timemap.get("foo", 5))
+
+    # out-of-order writes still land in timestamp order
+    timemap.set("foo", "bar0", 0)
+    timemap.set("foo", "bar3", 3)
+    print(timemap.get("foo", 0) == "bar0" and timemap.get("foo", 3) == "bar3" and timemap.get("foo", 2) == "bar")
+    print(timemap.get("missing", 5) == "")
+
+    # range queries are half-open [t0, t1); snapshot streams the as-of value of every key
+    timemap.set("baz", "qux", 2)
+    print(list(timemap.range("foo", 1, 4)) == [(1, "bar"), (3, "bar3")])
+    print(dict(timemap.snapshot(3)) == {"foo": "bar3", "baz": "qux"})
+    print(dict(timemap.snapshot(1)) == {"foo": "bar"})
+
+    # retention: keep the last N versions
+    timemap = TimeMap(max_versions=2)
+    for ts in range(1, 6):
+        timemap.set("k", f"v{ts}", ts)
+    print(list(timemap.range("k", 0, 10)) == [(4, "v4"), (5, "v5")] and timemap.get("k", 3) == "")
+
+    # retention: max age, idle keys are dropped by the incremental sweep
+    timemap = TimeMap(max_age=10)
+    timemap.set("idle", "x", 0)
+    for ts in range(1, 100):
+        timemap.set("busy", ts, ts)
+    print("idle" not in timemap.store and len(timemap.store["busy"]) == 11)
+
+    # downsampling: only the last value per bucket of 10 survives
+    timemap = TimeMap(bucket_size=10)
+    for ts, val in [(1, "a"), (5, "b"), (12, "c"), (19, "d"), (3, "late")]:
+        timemap.set("k", val, ts)
+    print(list(timemap.range("k", 0, 100)) == [(5, "b"), (19, "d")])
+
+    # memory stays bounded under a long stream of writes
+    timemap = TimeMap(max_versions=100)
+    for ts in range(100_000):
+        timemap.set("k", ts, ts)
+    print(len(timemap.store["k"].timestamps) <= 200)
+
+    # batched lookups match the scalar path and keep input order
+    timemap = TimeMap()
+    timemap.set("a", "a1", 1)
+    timemap.set("a", "a5", 5)
+    timemap.set("b", "b3", 3)
+    print(timemap.get_many(["a", "b", "a", "zzz", "b"], [4, 3, 9, 1, 2]) == ["a1", "b3", "a5", "", ""])
+    # float timestamps floor like get() does, rather than truncating toward zero
+    timemap.set("a", "a0", 0)
+    floats = [4.5, 0.5, -0.5, 5.0]
+    print(timemap.get_many(["a"] * 4, floats) == [timemap.get("a", t) for t in floats] == ["a1", "a0", "", "a5"])
+    timemap.set("a", "a7", 7)   # the column is still growable after get_many
+    print(timemap.get("a", 8) == "a7")
+
+    print("\n=== get/set latency vs history length ===")
+    benchmark()
+
+    print("\n=== get_many vs scalar get loop ===")
+    benchmark_get_many()
@@ -1,23 +1,209 @@
-from collections import defaultdict
 """Top K Scores Tracker starter file."""
+import random
+import time
+
+MAX_LEVEL = 32
+
+
+class SkipNode:
+    __slots__ = ("item", "forward", "span")
+
+    def __init__(self, item, level: int):
+        self.item = item
+        self.forward = [None] * level
+        self.span = [0] * level   # span[lvl]: bottom-level steps from this node to forward[lvl]
+
+
+class SkipList:
+    """Indexable skip list: sorted unique items, O(log n) expected insert/remove/rank/select."""
+
+    def __init__(self):
+        self.head = SkipNode(None, MAX_LEVEL)
+        self.level = 1
+        self.size = 0
+
+    def _random_level(self) -> int:
+        # geometric(1/2): count the trailing one bits of a random word
+        bits = random.getrandbits(MAX_LEVEL - 1)
+        level = 1
+        while bits & 1:
+            level += 1
+            bits >>= 1
+        return level
+
+    def insert(self, item) -> None:
+        update = [self.head] * MAX_LEVEL
+        rank = [0] * MAX_LEVEL   # position of update[lvl] in the bottom level
+        node = self.head
+        for lvl in range(self.level - 1, -1, -1):
+            rank[lvl] = 0 if lvl == self.level - 1 else rank[lvl + 1]
+            nxt = node.forward[lvl]
+            while nxt is not None and nxt.item < item:
+                rank[lvl] += node.span[lvl]
+                node = nxt
+                nxt = node.forward[lvl]
+            update[lvl] = node
+
+        level = self._random_level()
+        if level > self.level:
+            for lvl in range(self.level, level):
+                self.head.span[lvl] = self.size
+            self.level = level
+        node = SkipNode(item, level)
+        for lvl in range(level):
+            node.forward[lvl] = update[lvl].forward[lvl]
+            update[lvl].forward[lvl] = node
+            node.span[lvl] = update[lvl].span[lvl] - (rank[0] - rank[lvl])
+            update[lvl].span[lvl] = rank[0] - rank[lvl] + 1
+        for lvl in range(level, self.level):
+            update[lvl].span[lvl] += 1   # links that now jump over the new node
+        self.size += 1
+
+    def remove(self, item) -> bool:
+        update = [self.head] * MAX_LEVEL
+        node = self.head
+        for lvl in range(self.level - 1, -1, -1):
+            nxt = node.forward[lvl]
+            while nxt is not None and nxt.item < item:
+                node = nxt
+                nxt = node.forward[lvl]
+            update[lvl] = node
+        target = update[0].forward[0]
+        if target is None or target.item != item:
+            return False
+        for lvl in range(self.level):
+            if update[lvl].forward[lvl] is target:
+                update[lvl].span[lvl] += target.span[lvl] - 1
+                update[lvl].forward[lvl] = target.forward[lvl]
+            else:
+                update[lvl].span[lvl] -= 1
+        while self.level > 1 and self.head.forward[self.level - 1] is None:
+            self.level -= 1
+        self.size -= 1
+        return True
+
+    def rank(self, item) -> int:
+        """1-based position of `item`, or 0 if absent."""
+        traversed = 0
+        node = self.head
+        for lvl in range(self.level - 1, -1, -1):
+            nxt = node.forward[lvl]
+            while nxt is not None and nxt.item <= item:
+                traversed += node.span[lvl]
+                node = nxt
+                nxt = node.forward[lvl]
+            if node is not self.head and node.item == item:
+                return traversed
+        return 0
+
+    def _node_at(self, index: int) -> SkipNode | None:
+        """Node at 1-based `index`, or None if out of range."""
+        if index < 1 or index > self.size:
+            return None
+        traversed = 0
+        node = self.head
+        for lvl in range(self.level - 1, -1, -1):
+            while node.forward[lvl] is not None and traversed + node.span[lvl] <= index:
+                traversed += node.span[lvl]
+                node = node.forward[lvl]
+            if traversed == index:
+                return node
+        return None
+
+    def slice(self, start: int, count: int) -> list:
+        """`count` items starting at 0-based position `start`: O(log n + count)."""
+        result = []
+        node = self._node_at(start + 1)
+        while node is not None and len(result) < count:
+            result.append(node.item)
+            node = node.forward[0]
+        return result
+
+    def first(self, k: int) -> list:
+        return self.slice(0, k)
+
+    def __len__(self) -> int:
+        return self.size
 
 
 class TopKScoresTracker:
     def __init__(self):
-        self.kv = defaultdict()
+        self.kv = {}              # player -> score
+        self.index = SkipList()   # (-score, player), so iteration order is the leaderboard
 
     def add_score(self, player_id: str, delta: int) -> None:
-        if player_id not in self.kv:
+        if player_id in self.kv:
+            old = self.kv[player_id]
+            self.index.remove((-old, player_id))
+            self.kv[player_id] = old + delta
+        else:
             self.kv[player_id] = delta
-            return
-        self.kv[player_id] = self.kv[player_id]+delta
-        return
+        self.index.insert((-self.kv[player_id], player_id))
 
     def top_k(self, k: int) -> list[str]:
-        print(self.kv)
-        sorted_by_second_first_asc = sorted(self.kv, key=lambda player: ( -self.kv[player], player ))
-        print(sorted_by_second_first_asc)
-        return sorted_by_second_first_asc[:k]
+        # O(log n + k): walk the bottom level of the already-ordered index
+        return [player for _, player in self.index.first(k)]
+
+    def rank(self, player_id: str) -> int | None:
+        """1-based leaderboard position, or None for an unknown player."""
+        if player_id not in self.kv:
+            return None
+        return self.index.rank((-self.kv[player_id], player_id))
+
+    def percentile(self, player_id: str) -> float | None:
+        """Percentage of players ranked strictly below `player_id`."""
+        rank = self.rank(player_id)
+        if rank is None:
+            return None
+        return 100.0 * (len(self.kv) - rank) / len(self.kv)
+
+    def page(self, offset: int, limit: int) -> list[tuple[str, int]]:
+        return [(player, -neg_score) for neg_score, player in self.index.slice(offset, limit)]
+
+    def around(self, player_id: str, radius: int) -> list[tuple[str, int]]:
+        """Up to `radius` players on each side of `player_id`, plus the player itself."""
+        rank = self.rank(player_id)
+        if rank is None:
+            return []
+        start = max(rank - 1 - radius, 0)
+        return self.page(start, rank - 1 - start + radius + 1)
+
+
+def benchmark(num_players: int = 1_000_000, ops: int = 200_000, k: int = 10) -> None:
+    rng = random.Random(0)
+    tracker = TopKScoresTracker()
+    start = time.perf_counter()
+    for i in range(num_players):
+        tracker.add_score(f"p{i}", rng.randrange(1_000_000))
+    load_s = time.perf_counter() - start
+
+    # mixed workload: 99% score updates, 1% top-k polls
+    start = time.perf_counter()
+    for i in range(ops):
+        if i % 100 == 0:
+            tracker.top_k(k)
+        else:
+            tracker.add_score(f"p{rng.randrange(num_players)}", rng.randrange(-100, 1_000))
+    mixed_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(1_000):
+        tracker.top_k(k)
+    top_k_us = (time.perf_counter() - start) / 1_000 * 1e6
+
+    players = [f"p{rng.randrange(num_players)}" for _ in range(1_000)]
+    start = time.perf_counter()
+    for player in players:
+        tracker.rank(player)
+        tracker.around(player, 5)
+    rank_us = (time.perf_counter() - start) / 1_000 * 1e6
+    start = time.perf_counter()
+    for page in range(1_000):
+        tracker.page(page * 50, 50)
+    page_us = (time.perf_counter() - start) / 1_000 * 1e6
+    print(f"players={num_players:,}: load {load_s:.1f}s, mixed {ops / mixed_s:,.0f} ops/sec, "
+          f"top_{k} {top_k_us:.1f} us, rank+around {rank_us:.1f} us, page(50) {page_us:.1f} us")
+
 
 if __name__ == "__main__":
     ts = TopKScoresTracker()
@@ -36,4 +222,30 @@ if __name__ == "__main__":
     ts.add_score("bob", 20)
     ts.add_score("anna", 20)
     ts.add_score("zoe", 5)
-    print(ts.top_k(2) == ["anna", "bob"])
\ No newline at end of file
+    print(ts.top_k(2) == ["anna", "bob"])
+    print(ts.top_k(10) == ["anna", "bob", "zoe"])
+
+    # the index matches a full sort after many random updates
+    rng = random.Random(1)
+    ts = TopKScoresTracker()
+    for _ in range(5_000):
+        ts.add_score(f"p{rng.randrange(300)}", rng.randrange(-50, 100))
+    expected = sorted(ts.kv, key=lambda player: (-ts.kv[player], player))
+    print(ts.top_k(300) == expected and len(ts.index) == len(ts.kv))
+
+    # rank / page / around agree with the fully sorted leaderboard
+    print(all(ts.rank(player) == i + 1 for i, player in enumerate(expected)))
+    print(ts.page(40, 5) == [(p, ts.kv[p]) for p in expected[40:45]])
+    middle = expected[100]
+    print(ts.around(middle, 2) == [(p, ts.kv[p]) for p in expected[98:103]])
+    print(ts.around(expected[0], 2) == [(p, ts.kv[p]) for p in expected[:3]])
+    print(ts.rank("nobody") is None and ts.percentile(expected[0]) == 100.0 * (len(expected) - 1) / len(expected))
+
+    ts = TopKScoresTracker()
+    for player, score in [("a", 40), ("b", 30), ("c", 20), ("d", 10)]:
+        ts.add_score(player, score)
+    ts.add_score("d", 25)   # repositioned in place
+    print(ts.rank("d") == 2 and ts.percentile("a") == 75.0 and ts.page(1, 2) == [("d", 35), ("b", 30)])
+
+    print("\n=== Mixed add_score/top_k benchmark ===")
+    benchmark()
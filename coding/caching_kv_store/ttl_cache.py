@@ -22,34 +22,175 @@
 
 # - Without specifying `now_ms`, `get` should use current system time to determine expiration.
 
+import random
+import resource
 import time
 
+WHEEL_BITS = 6
+WHEEL_SLOTS = 1 << WHEEL_BITS
+WHEEL_MASK = WHEEL_SLOTS - 1
+
+
+class TimingWheel:
+    """Hierarchical timing wheel: O(1) schedule/cancel, amortized O(1) per expiry.
+
+    Level l has 64 slots of 64**l ticks each. A timer sits in the lowest level whose span covers
+    its distance from now; when a higher-level slot comes due, its timers cascade down a level.
+    Each key has at most one timer: scheduling a key again moves its timer.
+    """
+
+    def __init__(self, levels: int = 4, start_tick: int = 0):
+        self.levels = levels
+        self.now = start_tick
+        self.wheels = [[{} for _ in range(WHEEL_SLOTS)] for _ in range(levels)]  # slot: key -> tick
+        self.overflow = {}   # timers beyond the top level's horizon
+        self.location = {}   # key -> the slot dict currently holding its timer
+
+    @property
+    def size(self) -> int:
+        return len(self.location)
+
+    def add(self, key, expires_tick: int) -> None:
+        self.cancel(key)
+        self._place(key, max(expires_tick, self.now + 1))
+
+    def cancel(self, key) -> None:
+        slot = self.location.pop(key, None)
+        if slot is not None:
+            del slot[key]
+
+    def _place(self, key, expires_tick: int) -> None:
+        delta = expires_tick - self.now
+        for level in range(self.levels):
+            if delta < 1 << (WHEEL_BITS * (level + 1)):
+                slot = self.wheels[level][(expires_tick >> (WHEEL_BITS * level)) & WHEEL_MASK]
+                break
+        else:
+            slot = self.overflow
+        slot[key] = expires_tick
+        self.location[key] = slot
+
+    def _cascade(self, level: int) -> None:
+        if level == self.levels:
+            timers, self.overflow = self.overflow, {}
+        else:
+            slot = (self.now >> (WHEEL_BITS * level)) & WHEEL_MASK
+            if slot == 0:
+                self._cascade(level + 1)   # the level above wrapped too: refill this level first
+            timers = self.wheels[level][slot]
+            self.wheels[level][slot] = {}
+        for key, expires_tick in timers.items():
+            self._place(key, expires_tick)
+
+    def _next_due(self) -> int:
+        """The first tick after now at which a level-0 slot fires or a higher slot cascades."""
+        due = None
+        for level in range(self.levels):
+            shift = WHEEL_BITS * level
+            current = self.now >> shift
+            wheel = self.wheels[level]
+            for step in range(1, WHEEL_SLOTS + 1):
+                tick = (current + step) << shift
+                if due is not None and tick >= due:
+                    break   # nothing at this level comes due sooner
+                if wheel[(current + step) & WHEEL_MASK]:
+                    due = tick
+                    break
+        if self.overflow:
+            shift = WHEEL_BITS * self.levels
+            tick = ((self.now >> shift) + 1) << shift
+            due = tick if due is None else min(due, tick)
+        return due
+
+    def advance(self, to_tick: int) -> list:
+        """Move the clock to `to_tick` and return (key, tick) for every timer that fired.
+
+        Empty stretches are skipped: the clock jumps straight to the next slot that has timers,
+        so a long idle gap costs a few slot scans, not one step per tick.
+        """
+        fired = []
+        while self.now < to_tick:
+            if not self.location:
+                self.now = to_tick   # nothing scheduled, jump straight there
+                break
+            due = self._next_due()
+            if due > to_tick:
+                self.now = to_tick
+                break
+            self.now = due
+            if due & WHEEL_MASK == 0:
+                self._cascade(1)
+            slot = self.wheels[0][due & WHEEL_MASK]
+            if slot:
+                self.wheels[0][due & WHEEL_MASK] = {}
+                for key in slot:
+                    del self.location[key]
+                fired.extend(slot.items())
+        return fired
+
 
 class TTLCache:
-    def __init__(self):
-      self.now_ms = 0
-      self.ttl = 1000
-      self.cache = {}
-
-    def set(self, key: str, value: str, now_ms: int | None = None):
-      if now_ms is None:
-        now_ms = time.time() * 1000
-      self.cache[key] = (value, now_ms)
-        
+    def __init__(self, ttl_ms: int = 1000, tick_ms: int = 1):
+        self.ttl = ttl_ms
+        self.tick_ms = tick_ms
+        self.cache = {}      # key -> (value, expires_at_ms)
+        self.wheel = None    # created on first use so the clock starts at the caller's "now"
+
+    def _now(self, now_ms):
+        return time.time() * 1000 if now_ms is None else now_ms
+
+    def _tick(self, ms) -> int:
+        return int(ms // self.tick_ms)
+
+    def expire(self, now_ms: int | None = None) -> int:
+        """Actively remove every entry whose timer has fired; returns how many were removed."""
+        now_ms = self._now(now_ms)
+        if self.wheel is None:
+            self.wheel = TimingWheel(start_tick=self._tick(now_ms))
+        removed = 0
+        for key, _ in self.wheel.advance(self._tick(now_ms)):
+            entry = self.cache.get(key)
+            # each key's single timer tracks its latest deadline, so this is only a safety check
+            if entry is not None and now_ms > entry[1]:
+                del self.cache[key]
+                removed += 1
+        return removed
+
+    def set(self, key: str, value: str, now_ms: int | None = None, ttl_ms: int | None = None):
+        now_ms = self._now(now_ms)
+        self.expire(now_ms)
+        expires_at = now_ms + (self.ttl if ttl_ms is None else ttl_ms)
+        self.cache[key] = (value, expires_at)
+        # fire on the first tick strictly after the deadline; an overwrite moves the key's timer
+        self.wheel.add(key, self._tick(expires_at) + 1)
+
     def get(self, key: str, now_ms: int | None = None) -> object | None:
-      if now_ms is None:
-        now_ms = time.time() * 1000
-      if key not in self.cache:
-          return None
-      
-      value, timestamp = self.cache[key]  
-      
-      if timestamp < now_ms - self.ttl or timestamp > now_ms:
-        return None
-
-      return self.cache[key]  
-        
-  
+        now_ms = self._now(now_ms)
+        self.expire(now_ms)
+        if key not in self.cache:
+            return None
+        value, expires_at = self.cache[key]
+        if now_ms > expires_at:
+            return None
+        return value
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+
+def soak(total_writes: int = 2_000_000, writes_per_ms: int = 10, ttl_ms: int = 1000) -> None:
+    """Write-only workload with unique keys: memory must plateau at about ttl * write rate."""
+    cache = TTLCache(ttl_ms=ttl_ms)
+    start = time.perf_counter()
+    for i in range(total_writes):
+        cache.set(f"k{i}", "v", now_ms=i // writes_per_ms)
+        if (i + 1) % (total_writes // 5) == 0:
+            max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+            print(f"writes={i + 1:>9,}: live entries={len(cache):>6,}  "
+                  f"timers={cache.wheel.size:>6,}  max RSS={max_rss_mb:6.1f} MB")
+    elapsed = time.perf_counter() - start
+    print(f"{total_writes / elapsed:,.0f} writes/sec")
+
 
 if __name__ == "__main__":
     ttlcache = TTLCache()
@@ -62,5 +203,55 @@ if __name__ == "__main__":
     print(ttlcache.get("a", now_ms=1800))
     print(ttlcache.get("b", now_ms=2600))
 
+    # per-entry TTLs and active expiry: nothing dead is left after a sweep
+    ttlcache = TTLCache()
+    ttlcache.set("short", 1, now_ms=0, ttl_ms=10)
+    ttlcache.set("long", 2, now_ms=0, ttl_ms=100_000)   # lands on a higher wheel level
+    ttlcache.set("never-read", 3, now_ms=0)
+    print(ttlcache.expire(now_ms=11) == 1 and "short" not in ttlcache.cache)
+    print(ttlcache.expire(now_ms=1001) == 1 and set(ttlcache.cache) == {"long"})
+    print(ttlcache.get("long", now_ms=100_000) == 2)
+    print(ttlcache.expire(now_ms=100_001) == 1 and len(ttlcache) == 0)
+
+    # overwriting extends the deadline; the stale timer is ignored
+    ttlcache = TTLCache()
+    ttlcache.set("k", "v1", now_ms=0)
+    ttlcache.set("k", "v2", now_ms=900)
+    print(ttlcache.get("k", now_ms=1500) == "v2")
+    print(ttlcache.get("k", now_ms=1901) is None and len(ttlcache) == 0)
+
+    # a hot key rewritten many times within its TTL holds one timer, not one per write
+    ttlcache = TTLCache()
+    for i in range(300_000):
+        ttlcache.set("hot", i, now_ms=i // 1_000)
+    print(ttlcache.wheel.size == 1 and len(ttlcache) == 1)
+
+    # a long idle gap jumps between non-empty slots instead of stepping every tick
+    ttlcache = TTLCache()
+    ttlcache.set("day", 1, now_ms=0, ttl_ms=86_400_000)
+    ttlcache.set("soon", 2, now_ms=0, ttl_ms=5)
+    start = time.perf_counter()
+    hit = ttlcache.get("day", now_ms=600_000)
+    idle_ms = (time.perf_counter() - start) * 1e3
+    print(hit == 1 and "soon" not in ttlcache.cache and idle_ms < 50)
+    print(ttlcache.get("day", now_ms=86_400_001) is None and len(ttlcache) == 0)
+    print(f"get after a 10-minute idle gap: {idle_ms:.2f} ms")
 
+    # randomized: after every operation the cache holds exactly the live entries
+    rng = random.Random(0)
+    ttlcache, reference, now, ok = TTLCache(), {}, 0, True
+    for _ in range(20_000):
+        now += rng.choice([0, 1, 50, 5_000, 300_000]) if rng.random() < 0.3 else rng.randrange(3)
+        key = f"k{rng.randrange(50)}"
+        if rng.random() < 0.5:
+            ttl = rng.choice([1, 100, 5_000, 10**6, 10**8])
+            ttlcache.set(key, now, now_ms=now, ttl_ms=ttl)
+            reference[key] = (now, now + ttl)
+        else:
+            live = key in reference and now <= reference[key][1]
+            ok &= ttlcache.get(key, now_ms=now) == (reference[key][0] if live else None)
+        ok &= set(ttlcache.cache) == {k for k, (_, expires) in reference.items() if now <= expires}
+    print(ok)
 
+    print("\n=== Soak: write-only, unique keys, ttl=1s, 10 writes/ms ===")
+    soak()
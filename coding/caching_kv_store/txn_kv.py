@@ -8,7 +8,84 @@
 # 2. `begin()`; `set('a',3)`; `rollback()`; `get('a')` → `2`
 # 3. `commit()`; `get('a')` → `2`
 
+import bisect
+import heapq
+import random
 import threading
+import time
+from itertools import takewhile
+
+class SortedKeyIndex:
+    """Sorted set of keys stored as blocks of at most 2 * load keys.
+
+    A plain sorted list shifts every later key on insert/delete (O(N) memmove per new key);
+    here an insert or delete shifts one block plus the short list of block maxima.
+    """
+
+    def __init__(self, keys=(), load: int = 512):
+        self.load = load
+        keys = sorted(keys)
+        self.blocks = [keys[i:i + load] for i in range(0, len(keys), load)]
+        self.maxes = [block[-1] for block in self.blocks]
+        self.size = len(keys)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        return self.irange()
+
+    def add(self, key: str) -> None:
+        """Insert a key that is not already present."""
+        blocks, maxes = self.blocks, self.maxes
+        self.size += 1
+        if not blocks:
+            blocks.append([key])
+            maxes.append(key)
+            return
+        i = bisect.bisect_left(maxes, key)
+        if i == len(blocks):
+            i -= 1
+            blocks[i].append(key) # past every key: in-order loads stay O(1)
+            maxes[i] = key
+        else:
+            bisect.insort(blocks[i], key)
+        block = blocks[i]
+        if len(block) > 2 * self.load:
+            half = block[self.load:]
+            del block[self.load:]
+            blocks.insert(i + 1, half)
+            maxes[i] = block[-1]
+            maxes.insert(i + 1, half[-1])
+
+    def discard(self, key: str) -> None:
+        blocks, maxes = self.blocks, self.maxes
+        i = bisect.bisect_left(maxes, key)
+        if i == len(blocks):
+            return
+        block = blocks[i]
+        j = bisect.bisect_left(block, key)
+        if j == len(block) or block[j] != key:
+            return
+        del block[j]
+        self.size -= 1
+        if not block:
+            del blocks[i]
+            del maxes[i]
+        elif j == len(block):
+            maxes[i] = block[-1]
+
+    def irange(self, lo: str | None = None):
+        """Lazily yield keys >= lo in order. Don't modify the index while iterating."""
+        blocks = self.blocks
+        i = 0 if lo is None else bisect.bisect_left(self.maxes, lo)
+        if i == len(blocks):
+            return
+        j = 0 if lo is None else bisect.bisect_left(blocks[i], lo)
+        yield from blocks[i][j:]
+        for k in range(i + 1, len(blocks)):
+            yield from blocks[k]
+
 
 class Session:
     def __init__(self, transaction_level):
@@ -22,6 +99,13 @@ class TxnKV:
         self.transaction_level = 0
         self.lock = threading.Lock()
         self.seed = {}
+        self.sorted_keys = SortedKeyIndex() # sorted index over self.seed, for ordered range/prefix scans
+        # key -> stack of transaction levels that have written it, innermost last.
+        # Lets get() jump straight to the newest write instead of walking every session.
+        self.writers = {}
+        # Sorted index over self.writers for range overlays. Built by the first range() in a
+        # transaction and kept in sync from then on, so commits that never scan don't pay for it.
+        self.written_keys = None
 
     def change_transaction(self, int_change):
         with self.lock:
@@ -29,18 +113,32 @@ class TxnKV:
             return self.transaction_level
         
     def get(self, key: str) -> object | None:
-        for session in reversed(self.sessions):
-            if key in session.kv:
-                return session.kv[key]
-        if key in self.seed:
-            return self.seed[key]
-        return None
+        levels = self.writers.get(key)
+        if levels:
+            return self.sessions[levels[-1] - 1].kv[key]
+        return self.seed.get(key)
     
+    def set_base(self, key: str, val: str):
+        if val is None:
+            if key in self.seed: # nothing below the base to shadow, so drop the key
+                del self.seed[key]
+                self.sorted_keys.discard(key)
+            return
+        if key not in self.seed:
+            self.sorted_keys.add(key)
+        self.seed[key] = val
+
     def set(self, key: str, val: str) -> str:
         if len(self.sessions) == 0:
-            self.seed[key] = val
+            self.set_base(key, val)
             return
         session = self.sessions[-1]
+        if key not in session.kv:
+            if key not in self.writers:
+                self.writers[key] = []
+                if self.written_keys is not None:
+                    self.written_keys.add(key)
+            self.writers[key].append(session.transaction_level)
         session.kv[key] = val
 
     
@@ -53,23 +151,125 @@ class TxnKV:
         self.sessions.append(newSession)
     
     def commit(self):
-        num_sessions = len(self.sessions)
-        if num_sessions == 0:
+        # Only the keys the transaction changed are merged into its parent: O(changes), not O(store).
+        if len(self.sessions) == 0:
             raise Exception("Error: No sessions to commit!")
-        elif num_sessions == 1:
-            root = self.seed | self.sessions[-1].kv 
-            self.seed = root
-        else:
-            result = self.sessions[-2].kv | self.sessions[-1].kv 
-            self.sessions[-2].kv = result
+        session = self.sessions.pop()
+        parent = self.sessions[-1] if self.sessions else None
+        for key, val in session.kv.items():
+            levels = self.writers[key]
+            levels.pop()
+            if parent is None:
+                self.set_base(key, val)
+            else:
+                if key not in parent.kv:
+                    levels.append(parent.transaction_level)
+                parent.kv[key] = val
+            if not levels:
+                del self.writers[key]
+                if self.written_keys is not None:
+                    self.written_keys.discard(key)
+        if not self.sessions:
+            self.written_keys = None # nothing is pending any more
         self.change_transaction(-1)
-        del self.sessions[-1]
         
     
+    def range(self, lo: str | None = None, hi: str | None = None):
+        """Lazily yield (key, value) for lo <= key < hi over the merged view, in key order.
+
+        Streams the base index and merges in the keys written by open transactions; deleted
+        keys (None tombstones) are skipped. Don't write to the store while iterating.
+        """
+        if self.written_keys is None:
+            self.written_keys = SortedKeyIndex(self.writers)
+        base = self.sorted_keys.irange(lo)
+        overlay = self.written_keys.irange(lo) # only pending writes in range are ever touched
+        last = None
+        for key in heapq.merge(base, overlay):
+            if hi is not None and key >= hi:
+                return
+            if key == last:
+                continue # written in a transaction and present in the base
+            last = key
+            val = self.get(key)
+            if val is not None:
+                yield key, val
+
+    def scan(self, prefix: str):
+        """Lazily yield (key, value) for every live key starting with `prefix`, in key order."""
+        return takewhile(lambda item: item[0].startswith(prefix), self.range(prefix))
+
     def rollback(self):
+        if len(self.sessions) == 0:
+            raise Exception("Error: No sessions to rollback!")
+        session = self.sessions.pop()
+        for key in session.kv:
+            levels = self.writers[key]
+            levels.pop()
+            if not levels:
+                del self.writers[key]
+                if self.written_keys is not None:
+                    self.written_keys.discard(key)
+        if not self.sessions:
+            self.written_keys = None # nothing is pending any more
         self.change_transaction(-1)
-        del self.sessions[-1]  
-        
+
+
+def benchmark():
+    print("commit latency vs base size (100-key transactions):")
+    for base_size in (10_000, 100_000, 1_000_000):
+        txn = TxnKV()
+        for i in range(base_size):
+            txn.set_base(f"k{i:09d}", i)
+        start = time.perf_counter()
+        for round_ in range(100):
+            txn.begin()
+            for i in range(100):
+                txn.set(f"k{round_ * 100 + i:09d}", -i)
+            txn.commit()
+        print(f"  base={base_size:>9,}: {(time.perf_counter() - start) / 100 * 1e6:8.1f} us/commit")
+
+    print("commit latency vs base size (100 new keys at random positions per commit):")
+    rng = random.Random(0)
+    for base_size in (10_000, 100_000, 1_000_000, 3_000_000):
+        txn = TxnKV()
+        for i in range(base_size):
+            txn.set_base(f"k{i:09d}", i)
+        start = time.perf_counter()
+        for round_ in range(100):
+            txn.begin()
+            for i in range(100):
+                txn.set(f"k{rng.randrange(base_size):09d}-{round_}-{i}", i)
+            txn.commit()
+        print(f"  base={base_size:>9,}: {(time.perf_counter() - start) / 100 * 1e6:8.1f} us/commit")
+
+    print("get latency vs nesting depth (key only written in the base):")
+    for depth in (1, 10, 100, 1_000):
+        txn = TxnKV()
+        txn.set("base-key", "v")
+        for level in range(depth):
+            txn.begin()
+            txn.set(f"level-{level}", level)
+        start = time.perf_counter()
+        for _ in range(100_000):
+            txn.get("base-key")
+        print(f"  depth={depth:>5,}: {(time.perf_counter() - start) / 100_000 * 1e9:6.0f} ns/get")
+
+    print("prefix scan of 100 keys out of a 1M-key base, inside an open transaction:")
+    txn = TxnKV()
+    for i in range(1_000_000):
+        txn.set_base(f"user:{i // 100:06d}:{i % 100:02d}", i)
+    txn.begin()
+    txn.set("user:004242:50", "changed")
+    start = time.perf_counter()
+    rows = list(txn.scan("user:004242:"))
+    print(f"  {len(rows)} rows in {(time.perf_counter() - start) * 1e6:.0f} us")
+    for i in range(0, 1_000_000, 10):
+        txn.set(f"user:{i // 100:06d}:{i % 100:02d}", "pending")
+    start = time.perf_counter()
+    rows = list(txn.scan("user:004242:"))
+    print(f"  {len(rows)} rows in {(time.perf_counter() - start) * 1e6:.0f} us with 100k pending writes")
+
     
 if __name__ == "__main__":
     print("=== Demonstrating Examples from Problem Statement ===\n")
@@ -100,4 +300,59 @@ if __name__ == "__main__":
     print(f"Result: {result3}")  # Should be '2'
     print()
     
-    print("=== Examples completed ===")
\ No newline at end of file
+    print("=== Examples completed ===")
+    print()
+
+    # nested commit/rollback/delete keep reads consistent at every level
+    txn = TxnKV()
+    txn.set('a', '1')
+    txn.begin()
+    txn.set('a', '2')
+    txn.begin()
+    txn.delete('a')
+    txn.set('b', 'x')
+    print(txn.get('a') is None and txn.get('b') == 'x')
+    txn.rollback()
+    print(txn.get('a') == '2' and txn.get('b') is None)
+    txn.begin()
+    txn.set('c', 'y')
+    txn.commit()
+    print(txn.get('c') == 'y' and txn.sessions[-1].kv == {'a': '2', 'c': 'y'})
+    txn.commit()
+    print(txn.seed == {'a': '2', 'c': 'y'} and txn.writers == {} and txn.sessions == [])
+    print()
+
+    # ordered scans over the base plus open transactions, skipping deletes
+    txn = TxnKV()
+    for key in ['user:41:a', 'user:42:a', 'user:42:b', 'user:42:c', 'user:43:a']:
+        txn.set(key, key[-1])
+    txn.begin()
+    txn.delete('user:42:b')
+    txn.set('user:42:bb', 'new')
+    txn.begin()
+    txn.set('user:42:a', 'A')
+    print(list(txn.scan('user:42:')) == [('user:42:a', 'A'), ('user:42:bb', 'new'), ('user:42:c', 'c')])
+    print(list(txn.range('user:41:', 'user:42:b')) == [('user:41:a', 'a'), ('user:42:a', 'A')])
+    txn.rollback()
+    print(list(txn.written_keys) == sorted(txn.writers))
+    txn.commit()
+    print(txn.written_keys is None)
+    print(list(txn.scan('user:42:')) == [('user:42:a', 'a'), ('user:42:bb', 'new'), ('user:42:c', 'c')])
+    print(list(txn.sorted_keys) == sorted(txn.seed))
+
+    # the blocked index matches a plain sorted list under random inserts and deletes
+    rng = random.Random(1)
+    index, reference = SortedKeyIndex(load=4), set()
+    for _ in range(5_000):
+        key = f"{rng.randrange(2_000):04d}"
+        if key in reference:
+            index.discard(key)
+            reference.discard(key)
+        else:
+            index.add(key)
+            reference.add(key)
+    print(list(index) == sorted(reference) and len(index) == len(reference)
+          and list(index.irange("1000")) == sorted(k for k in reference if k >= "1000"))
+    print()
+
+    benchmark()
\ No newline at end of file
@@ -0,0 +1,125 @@
+# Weighted LRU Cache (byte budget + eviction listener)
+
+# Problem Statement:
+# `LRUCache` evicts by entry count, but values range from a few bytes to megabytes, so a
+# count limit either wastes memory or blows up RSS.
+# Make capacity a total weight instead. A `weigher(key, value)` function gives each entry its
+# weight; `put` evicts as many LRU entries as needed to fit the new one, refuses entries heavier
+# than the whole budget, and reports evicted entries to `on_evict` in one batch per `put`.
+
+# Examples:
+# 1. `cache = WeightedLRUCache(10, weigher=lambda k, v: len(v))`
+# 2. `put("a", "xxxx"); put("b", "xxxx"); put("c", "xxxxx")` → evicts "a" (weight 13 > 10)
+# 3. `put("big", "x" * 11)` → `False` (heavier than the whole budget, not stored)
+
+from collections import OrderedDict
+import sys
+import time
+
+
+def default_weigher(key, value) -> int:
+    return 1
+
+
+class WeightedLRUCache:
+    def __init__(self, max_weight: int, weigher=default_weigher, on_evict=None):
+        if max_weight <= 0:
+            raise ValueError("max_weight must be positive")
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.on_evict = on_evict    # called with a list of (key, value) evicted by one put
+        self.cache = OrderedDict()  # key -> (value, weight)
+        self.total_weight = 0
+
+    def get(self, key, default=-1):
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key][0]
+        return default
+
+    def put(self, key, value) -> bool:
+        weight = self.weigher(key, value)
+        if weight < 0:
+            raise ValueError("weigher returned a negative weight")
+        if weight > self.max_weight:
+            # Refuse instead of flushing the whole cache for an entry that can never fit.
+            # Drop any stale copy so readers don't see the old value for a key we just "wrote",
+            # and report it like any other eviction so listeners can release it.
+            if key in self.cache:
+                old_value, _ = self.cache[key]
+                self._remove(key)
+                if self.on_evict is not None:
+                    self.on_evict([(key, old_value)])
+            return False
+
+        if key in self.cache:
+            self.total_weight -= self.cache[key][1]
+            self.cache.move_to_end(key)
+        self.cache[key] = (value, weight)
+        self.total_weight += weight
+
+        evicted = []
+        while self.total_weight > self.max_weight:
+            old_key, (old_value, old_weight) = self.cache.popitem(last=False)
+            self.total_weight -= old_weight
+            evicted.append((old_key, old_value))
+        if evicted and self.on_evict is not None:
+            self.on_evict(evicted)
+        return True
+
+    def _remove(self, key) -> None:
+        if key in self.cache:
+            _, weight = self.cache.pop(key)
+            self.total_weight -= weight
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+
+if __name__ == "__main__":
+    batches = []
+    cache = WeightedLRUCache(10, weigher=lambda k, v: len(v), on_evict=batches.append)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    cache.put("c", "xxxxx")
+    print(cache.get("a") == -1)                          # evicted to make room
+    print(batches == [[("a", "xxxx")]])
+    print(cache.total_weight == 9)
+
+    # one big entry evicts several LRU entries, reported in a single batch
+    batches.clear()
+    cache.put("d", "x" * 10)
+    print(batches == [[("b", "xxxx"), ("c", "xxxxx")]])
+    print(list(cache.cache) == ["d"])
+
+    # entries heavier than the whole budget are refused and nothing is evicted
+    print(cache.put("big", "x" * 11) is False)
+    print(cache.get("d") == "x" * 10)
+
+    # an oversized write over an existing key drops the stale copy and reports it
+    batches.clear()
+    print(cache.put("d", "x" * 11) is False and cache.get("d") == -1)
+    print(batches == [[("d", "x" * 10)]] and cache.total_weight == 0)
+
+    # replacing a key re-weighs it instead of double counting
+    cache = WeightedLRUCache(10, weigher=lambda k, v: len(v))
+    cache.put("a", "xx")
+    cache.put("a", "xxxxxx")
+    print(cache.total_weight == 6 and len(cache) == 1)
+
+    # default weigher of 1 per entry gives the classic count-bounded LRU
+    cache = WeightedLRUCache(2)
+    cache.put(1, 1)
+    cache.put(2, 2)
+    cache.get(1)
+    cache.put(3, 3)
+    print(cache.get(2) == -1)
+
+    print("\n=== Byte-budgeted cache with mixed value sizes ===")
+    cache = WeightedLRUCache(1_000_000, weigher=lambda k, v: sys.getsizeof(v))
+    start = time.perf_counter()
+    for i in range(100_000):
+        cache.put(i, b"x" * (16 if i % 100 else 50_000))
+    elapsed = time.perf_counter() - start
+    print(f"entries={len(cache)} weight={cache.total_weight:,} / {cache.max_weight:,} "
+          f"puts/sec={100_000 / elapsed:,.0f}")
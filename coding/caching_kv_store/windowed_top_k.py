@@ -0,0 +1,163 @@
+# Windowed and Time-Decayed Leaderboards
+
+# Problem Statement:
+# `TopKScoresTracker.add_score` accumulates all-time totals, but the product also needs
+# "top players in the last hour" and exponentially decayed "trending" scores.
+#   - WindowedTopKScoresTracker: the window is split into a ring of time buckets holding per-player
+#     partial sums. When time moves past a bucket, only that bucket's sums are subtracted from the
+#     running totals; nothing is recomputed from scratch.
+#   - DecayedTopKScoresTracker: score(t) = sum(delta_i * exp(-rate * (t - t_i))). Instead of
+#     decaying every score on every tick, each delta is stored scaled up by exp(rate * t_i), kept in
+#     log space so it never overflows. The scale factor is shared by every player, so relative order
+#     never changes and decay costs nothing per tick.
+# Both keep the skip-list index from `TopKScoresTracker`, so `top_k` stays O(log n + k).
+
+# Examples:
+# 1. window=60, add_score("a", 5, now=0); add_score("b", 3, now=30); top_k(2, now=61) → ["b"]
+# 2. half_life=10: add_score("a", 8, now=0); score("a", now=10) → 4.0
+
+import math
+import random
+import time
+
+from top_k_scores import SkipList
+
+
+class WindowedTopKScoresTracker:
+    def __init__(self, window: float, num_buckets: int = 60):
+        self.bucket_width = window / num_buckets
+        self.num_buckets = num_buckets
+        self.buckets = [{} for _ in range(num_buckets)]  # ring: player -> partial sum
+        self.current = None   # absolute index of the newest bucket
+        self.kv = {}          # player -> sum over the live buckets
+        self.index = SkipList()
+
+    def _set_total(self, player_id: str, total: int) -> None:
+        if player_id in self.kv:
+            self.index.remove((-self.kv[player_id], player_id))
+        if total == 0:
+            self.kv.pop(player_id, None)
+            return
+        self.kv[player_id] = total
+        self.index.insert((-total, player_id))
+
+    def _advance(self, now: float) -> None:
+        bucket = int(now // self.bucket_width)
+        if self.current is None:
+            self.current = bucket
+            return
+        # expire at most one full ring, however long we were idle
+        first = max(self.current + 1, bucket - self.num_buckets + 1)
+        for absolute in range(first, bucket + 1):
+            slot = self.buckets[absolute % self.num_buckets]
+            for player_id, partial in slot.items():
+                # a player whose total hit 0 was dropped from kv but can still have partial sums
+                self._set_total(player_id, self.kv.get(player_id, 0) - partial)
+            slot.clear()
+        self.current = max(self.current, bucket)
+
+    def add_score(self, player_id: str, delta: int, now: float | None = None) -> None:
+        if now is None:
+            now = time.time()
+        self._advance(now)
+        bucket = int(now // self.bucket_width)
+        if bucket <= self.current - self.num_buckets:
+            return  # older than the window already
+        slot = self.buckets[bucket % self.num_buckets]
+        slot[player_id] = slot.get(player_id, 0) + delta
+        self._set_total(player_id, self.kv.get(player_id, 0) + delta)
+
+    def top_k(self, k: int, now: float | None = None) -> list[str]:
+        self._advance(time.time() if now is None else now)
+        return [player for _, player in self.index.first(k)]
+
+
+class DecayedTopKScoresTracker:
+    def __init__(self, half_life: float):
+        self.rate = math.log(2) / half_life
+        self.kv = {}            # player -> log of the time-scaled score
+        self.index = SkipList()  # (-log_score, player)
+
+    def add_score(self, player_id: str, delta: float, now: float | None = None) -> None:
+        if delta <= 0:
+            raise ValueError("decayed scores only accept positive deltas")
+        if now is None:
+            now = time.time()
+        # log(delta * exp(rate * now)) = log(delta) + rate * now
+        contribution = math.log(delta) + self.rate * now
+        if player_id in self.kv:
+            old = self.kv[player_id]
+            self.index.remove((-old, player_id))
+            high, low = max(old, contribution), min(old, contribution)
+            contribution = high + math.log1p(math.exp(low - high))   # log-add-exp
+        self.kv[player_id] = contribution
+        self.index.insert((-contribution, player_id))
+
+    def score(self, player_id: str, now: float | None = None) -> float:
+        if player_id not in self.kv:
+            return 0.0
+        if now is None:
+            now = time.time()
+        return math.exp(self.kv[player_id] - self.rate * now)
+
+    def top_k(self, k: int) -> list[str]:
+        # every score shares the same exp(-rate * now) factor, so the order is time-independent
+        return [player for _, player in self.index.first(k)]
+
+
+if __name__ == "__main__":
+    board = WindowedTopKScoresTracker(window=60, num_buckets=60)
+    board.add_score("a", 5, now=0)
+    board.add_score("b", 3, now=30)
+    print(board.top_k(2, now=59) == ["a", "b"])
+    print(board.top_k(2, now=61) == ["b"])            # a's bucket expired
+    board.add_score("b", 1, now=200)                  # idle gap longer than the window
+    print(board.kv == {"b": 1} and board.top_k(5, now=200) == ["b"])
+
+    # totals that reach zero drop the player, but their partial sums still expire cleanly
+    board = WindowedTopKScoresTracker(window=60, num_buckets=60)
+    board.add_score("x", 0, now=0)
+    board.add_score("y", 5, now=0)
+    board.add_score("y", -5, now=30)
+    board.add_score("z", 2, now=30)
+    print(board.top_k(5, now=61) == ["z", "y"] and board.kv == {"y": -5, "z": 2})
+    print(board.top_k(5, now=91) == [] and board.kv == {})
+
+    # rolling window matches a brute-force recount
+    rng = random.Random(0)
+    board = WindowedTopKScoresTracker(window=100, num_buckets=10)
+    events = []
+    for t in range(0, 2_000, 3):
+        player, delta = f"p{rng.randrange(20)}", rng.randrange(1, 10)
+        events.append((t, player, delta))
+        board.add_score(player, delta, now=t)
+    now = 1_999
+    expected = {}
+    for t, player, delta in events:
+        if t // 10 > now // 10 - 10:
+            expected[player] = expected.get(player, 0) + delta
+    board.top_k(1, now=now)
+    print(board.kv == expected)
+
+    trending = DecayedTopKScoresTracker(half_life=10)
+    trending.add_score("a", 8, now=0)
+    print(abs(trending.score("a", now=10) - 4.0) < 1e-9)
+    trending.add_score("b", 5, now=10)
+    print(trending.top_k(2) == ["b", "a"])           # b's 5 beats a's decayed 4
+    trending.add_score("a", 2, now=10)
+    print(abs(trending.score("a", now=10) - 6.0) < 1e-9 and trending.top_k(1) == ["a"])
+    # far-future timestamps stay finite in log space
+    trending.add_score("c", 1, now=1e9)
+    print(trending.top_k(1) == ["c"] and math.isfinite(trending.score("c", now=1e9)))
+
+    print("\n=== 200k events over 10k players, 1h window in 60 buckets ===")
+    board = WindowedTopKScoresTracker(window=3_600, num_buckets=60)
+    start = time.perf_counter()
+    for i in range(200_000):
+        board.add_score(f"p{rng.randrange(10_000)}", 1, now=i * 0.1)
+    print(f"windowed: {200_000 / (time.perf_counter() - start):,.0f} adds/sec")
+    trending = DecayedTopKScoresTracker(half_life=600)
+    start = time.perf_counter()
+    for i in range(200_000):
+        trending.add_score(f"p{rng.randrange(10_000)}", 1, now=i * 0.1)
+    print(f"decayed:  {200_000 / (time.perf_counter() - start):,.0f} adds/sec")
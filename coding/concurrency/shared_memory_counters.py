@@ -0,0 +1,244 @@
+# Named counters shared by a group of worker processes.
+#
+# One shared memory block holds a small header (worker count, counter names) and then one
+# fixed-layout row per worker: [sequence, counter_0, ..., counter_n-1] as int64. A worker only
+# ever writes its own row, so increments need no lock and never wait on another process.
+# Each row is a seqlock: the writer bumps the sequence to odd, updates its counters and bumps it
+# back to even. A reader copies the row and retries if the sequence was odd or changed, so it
+# gets a consistent view of every row without ever blocking the writers.
+
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+HEADER_SLOTS = 3  # num_workers, num_counters, names_len
+TRACK_PARAM = sys.version_info >= (3, 13)   # SharedMemory(track=False) exists from 3.13
+
+
+class StaleRowError(RuntimeError):
+    """A worker's row stayed mid-update for the whole read timeout (the writer likely died)."""
+
+    def __init__(self, worker_id: int):
+        super().__init__(f"worker {worker_id} row is stuck mid-update")
+        self.worker_id = worker_id
+
+
+class SharedCounterRegistry:
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.buf = shm.buf.cast("q")
+        self.num_workers, self.num_counters, names_len = self.buf[:HEADER_SLOTS]
+        start = 8 * HEADER_SLOTS
+        self.names = bytes(shm.buf[start:start + names_len]).decode().split("\n")
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.rows_start = HEADER_SLOTS + (names_len + 7) // 8
+        self.row_len = 1 + self.num_counters
+
+    @classmethod
+    def create(cls, counter_names: list[str], num_workers: int, name: str | None = None) -> "SharedCounterRegistry":
+        if not counter_names:
+            raise ValueError("counter_names must not be empty")
+        if len(set(counter_names)) != len(counter_names):
+            raise ValueError("counter_names must be unique")
+        if any(not name or "\n" in name for name in counter_names):
+            raise ValueError("counter names must be non-empty and must not contain newlines")
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        names = "\n".join(counter_names).encode()
+        slots = HEADER_SLOTS + (len(names) + 7) // 8 + num_workers * (1 + len(counter_names))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=8 * slots)
+        shm.buf[:8 * slots] = bytes(8 * slots)
+        header = shm.buf.cast("q")
+        header[0], header[1], header[2] = num_workers, len(counter_names), len(names)
+        header.release()
+        shm.buf[8 * HEADER_SLOTS:8 * HEADER_SLOTS + len(names)] = names
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedCounterRegistry":
+        # only the creator unlinks the segment. Before 3.13 attaching registers the segment with
+        # this process's resource tracker, which would unlink it when an independently started
+        # worker exits, so take it straight back out
+        if TRACK_PARAM:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def worker(self, worker_id: int) -> "WorkerCounters":
+        if not 0 <= worker_id < self.num_workers:
+            raise ValueError(f"worker_id must be in [0, {self.num_workers})")
+        return WorkerCounters(self, self.rows_start + worker_id * self.row_len)
+
+    def _read_row(self, worker_id: int, timeout_s: float) -> list[int]:
+        buf = self.buf
+        base = self.rows_start + worker_id * self.row_len
+        deadline = None
+        spin = 0
+        while True:
+            before = buf[base]
+            row = buf[base + 1:base + self.row_len].tolist()
+            if not before & 1 and buf[base] == before:
+                return row
+            spin += 1
+            if spin & 63 == 0:
+                # the writer was descheduled mid-update; let it finish, but a writer that died
+                # mid-update leaves its sequence odd forever, so never return a torn copy
+                now = time.monotonic()
+                if deadline is None:
+                    deadline = now + timeout_s
+                elif now > deadline:
+                    raise StaleRowError(worker_id)
+                time.sleep(0)
+
+    def snapshot(self, timeout_s: float = 1.0) -> dict[str, int]:
+        """Sum every worker's row, each read consistently; raises StaleRowError for a stuck row."""
+        totals = [0] * self.num_counters
+        for worker_id in range(self.num_workers):
+            row = self._read_row(worker_id, timeout_s)
+            for i, value in enumerate(row):
+                totals[i] += value
+        return dict(zip(self.names, totals))
+
+    def close(self) -> None:
+        self.buf.release()
+        self.shm.close()
+        if self.owner:
+            if not TRACK_PARAM:
+                # a worker sharing our resource tracker may have unregistered the segment in
+                # attach; register again so unlink's unregister stays balanced
+                resource_tracker.register(self.shm._name, "shared_memory")
+            self.shm.unlink()
+
+
+class WorkerCounters:
+    """The calling process's row. Only one process may use a given worker_id."""
+
+    def __init__(self, registry: SharedCounterRegistry, base: int):
+        self.buf = registry.buf
+        self.index = registry.index
+        self.seq = base
+
+    def increment(self, name: str, n: int = 1) -> None:
+        buf, seq = self.buf, self.seq
+        buf[seq] += 1
+        buf[seq + 1 + self.index[name]] += n
+        buf[seq] += 1
+
+    def add_many(self, deltas: dict[str, int]) -> None:
+        """Apply several increments that readers see together or not at all."""
+        buf, seq = self.buf, self.seq
+        buf[seq] += 1
+        for name, n in deltas.items():
+            buf[seq + 1 + self.index[name]] += n
+        buf[seq] += 1
+
+
+def serve(registry_name: str, worker_id: int, requests: int, setup_times) -> None:
+    start = time.perf_counter()
+    registry = SharedCounterRegistry.attach(registry_name)
+    counters = registry.worker(worker_id)
+    setup_times[worker_id] = time.perf_counter() - start
+    for _ in range(requests):
+        counters.add_many({"requests": 1, "bytes": 512})
+    del counters
+    registry.close()
+
+
+def serve_locked(totals, requests: int) -> None:
+    for _ in range(requests):
+        with totals.get_lock():
+            totals[0] += 1
+            totals[1] += 512
+
+
+def benchmark(num_workers: int = 4, requests: int = 200_000) -> None:
+    registry = SharedCounterRegistry.create(["requests", "bytes", "errors"], num_workers)
+    setup_times = mp.Array("d", num_workers, lock=False)
+    procs = [mp.Process(target=serve, args=(registry.name, i, requests, setup_times)) for i in range(num_workers)]
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    snapshots = inconsistent = 0
+    while any(p.is_alive() for p in procs):
+        snap = registry.snapshot()
+        snapshots += 1
+        # add_many updates requests and bytes together, so every snapshot must keep them in step
+        inconsistent += snap["bytes"] != 512 * snap["requests"]
+    for p in procs:
+        p.join()
+    shared_s = time.perf_counter() - start
+    final = registry.snapshot()
+    registry.close()
+
+    totals = mp.Array("q", 2)  # requests, bytes behind one cross-process lock
+    procs = [mp.Process(target=serve_locked, args=(totals, requests)) for _ in range(num_workers)]
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    locked_s = time.perf_counter() - start
+
+    print(f"{num_workers} workers x {requests:,} requests")
+    print(f"  shared rows:   {shared_s:.2f}s, final {final}")
+    print(f"  {snapshots:,} concurrent snapshots, {inconsistent} inconsistent")
+    print(f"  worker attach: max {max(setup_times) * 1e3:.2f} ms")
+    print(f"  locked Array:  {locked_s:.2f}s, final {totals[:]}")
+
+
+if __name__ == "__main__":
+    registry = SharedCounterRegistry.create(["requests", "errors"], num_workers=2)
+    other = SharedCounterRegistry.attach(registry.name)
+    w0, w1 = registry.worker(0), other.worker(1)
+    w0.increment("requests")
+    w1.increment("requests", 4)
+    w1.add_many({"requests": 1, "errors": 1})
+    print(registry.snapshot() == {"requests": 6, "errors": 1} == other.snapshot())
+    try:
+        registry.worker(2)
+        print(False)
+    except ValueError:
+        print(True)
+
+    # independently started workers (own resource tracker) attach, exit, and leave the block alive
+    worker_script = ("import sys; from shared_memory_counters import SharedCounterRegistry; "
+                     "r = SharedCounterRegistry.attach(sys.argv[1]); w = r.worker(1); "
+                     "w.increment('errors'); del w; r.close()")
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker_script, registry.name],
+                       check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    print(registry.snapshot() == {"requests": 6, "errors": 3})
+
+    # a row left mid-update (writer died) is reported, not returned torn
+    w0.buf[w0.seq] += 1
+    try:
+        registry.snapshot(timeout_s=0.05)
+        print(False)
+    except StaleRowError as e:
+        print(e.worker_id == 0)
+    w0.buf[w0.seq] += 1
+
+    for bad_names in ([], ["a\nb"], ["a", "a"], [""]):
+        try:
+            SharedCounterRegistry.create(bad_names, num_workers=1)
+            print(False)
+        except ValueError:
+            pass
+    print(True)
+
+    del w0, w1
+    other.close()
+    registry.close()
+
+    print()
+    benchmark()
@@ -0,0 +1,157 @@
+# A single lock around a shared counter makes every increment a serialization point.
+# Striped metrics give each thread its own cell: a write touches only the calling thread's
+# cell, so writers never contend, and a read combines all cells. The only lock is taken when
+# a thread writes for the first time (to register its cell) and on reads.
+
+import operator
+import threading
+import time
+
+from thread_safe_counter import Counter
+
+
+class _Striped:
+    def __init__(self, initial, combine):
+        self.initial = initial
+        self.combine = combine   # folds two cell values: operator.add for sums, max for maxima
+        self.local = threading.local()
+        self.cells = []          # (owning thread, [value]); only the owner writes its cell
+        self.retired = initial   # combined value of cells whose threads have exited
+        self.lock = threading.Lock()
+
+    def _cell(self) -> list:
+        try:
+            return self.local.cell
+        except AttributeError:
+            cell = self.local.cell = [self.initial]
+            with self.lock:
+                self.cells.append((threading.current_thread(), cell))
+            return cell
+
+    def value(self):
+        with self.lock:
+            live = []
+            for thread, cell in self.cells:
+                if thread.is_alive():
+                    live.append((thread, cell))
+                else:
+                    # an exited thread can no longer write, so its cell is final
+                    self.retired = self.combine(self.retired, cell[0])
+            self.cells = live
+            total = self.retired
+            for _, cell in live:
+                total = self.combine(total, cell[0])
+            return total
+
+
+class StripedCounter(_Striped):
+    """Monotonic counter, e.g. requests served."""
+
+    def __init__(self):
+        super().__init__(0, operator.add)
+
+    def increment(self, n: int = 1) -> None:
+        self._cell()[0] += n
+
+
+class StripedGauge(_Striped):
+    """Up/down value, e.g. requests in flight. Reads sum the per-thread deltas."""
+
+    def __init__(self):
+        super().__init__(0, operator.add)
+
+    def add(self, delta: int = 1) -> None:
+        self._cell()[0] += delta
+
+    def sub(self, delta: int = 1) -> None:
+        self._cell()[0] -= delta
+
+
+class StripedMax(_Striped):
+    """Largest value observed, e.g. peak latency. Reads take the max of the per-thread maxima."""
+
+    def __init__(self, initial=float("-inf")):
+        super().__init__(initial, max)
+
+    def observe(self, value) -> None:
+        cell = self._cell()
+        if value > cell[0]:
+            cell[0] = value
+
+
+class LockedCounter:
+    """Counter behind one lock, without the sleep in thread_safe_counter.Counter."""
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def increment(self):
+        with self.lock:
+            self.value += 1
+
+
+def run(counter, num_threads: int, per_thread: int) -> float:
+    def worker():
+        for _ in range(per_thread):
+            counter.increment()
+
+    threads = [threading.Thread(target=worker) for _ in range(num_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def benchmark(thread_counts=(1, 2, 4, 8, 16), per_thread: int = 100_000, sleeping_per_thread: int = 200):
+    print(f"{'threads':>7} {'Counter (sleeps)':>18} {'LockedCounter':>15} {'StripedCounter':>16}   ops/s")
+    for num_threads in thread_counts:
+        rates = []
+        for make, n in ((Counter, sleeping_per_thread), (LockedCounter, per_thread), (StripedCounter, per_thread)):
+            counter = make()
+            elapsed = run(counter, num_threads, n)
+            value = counter.value() if callable(counter.value) else counter.value
+            assert value == num_threads * n, (make.__name__, value)
+            rates.append(num_threads * n / elapsed)
+        print(f"{num_threads:>7} {rates[0]:>18,.0f} {rates[1]:>15,.0f} {rates[2]:>16,.0f}")
+
+
+if __name__ == "__main__":
+    counter = StripedCounter()
+    print(run(counter, 10, 1000) >= 0 and counter.value() == 10_000)
+    # cells of exited threads are folded into the retired total and stay counted
+    print(counter.value() == 10_000 and counter.cells == [])
+    counter.increment(5)
+    print(counter.value() == 10_005)
+
+    gauge = StripedGauge()
+    done = threading.Event()
+
+    def request():
+        gauge.add()
+        done.wait()
+        gauge.sub()
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for t in threads:
+        t.start()
+    while gauge.value() < 4:
+        time.sleep(0.001)
+    print(gauge.value() == 4)
+    done.set()
+    for t in threads:
+        t.join()
+    print(gauge.value() == 0)
+
+    peak = StripedMax()
+    threads = [threading.Thread(target=lambda i=i: [peak.observe(i * 100 + j) for j in range(50)]) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(peak.value() == 749 and StripedMax().value() == float("-inf"))
+
+    print()
+    benchmark()